@@ -0,0 +1,209 @@
+"""
+analytics.py - Service throughput numbers for one session
+
+The simulation reports every customer lifecycle event to SessionAnalytics:
+spawned, turned away at the door, order visible once seated, served or
+left. It also reports every station state change, such as prep going from
+idle to prepping or a burner going from cooking to blocked. Each event is
+folded into running aggregates as it happens and then dropped. Waits go
+into fixed-size histograms and station time goes into per-state totals, so
+memory stays the same however long the session runs.
+
+summary() turns the aggregates into orders per minute, wait percentiles,
+the abandonment rate and station idle time. write() saves that as the
+session's summary file, so kitchen flow changes can be compared by their
+effect on service.
+"""
+
+import json
+import math
+
+from constants import FPS
+
+IDLE = "idle"
+
+
+class WaitHistogram:
+    """Counts of waits in fixed buckets of bucket_ticks; the last bucket also takes anything longer"""
+
+    def __init__(self, bucket_ticks=15, buckets=480):
+        self.bucket_ticks = bucket_ticks  # A quarter second, up to two minutes, at 60 ticks per second
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ticks):
+        self.counts[min(ticks // self.bucket_ticks, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += ticks
+        self.max = max(self.max, ticks)
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-th wait, in ticks, never more than the longest wait"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min((i + 1) * self.bucket_ticks, self.max)
+        return self.max
+
+    def stats(self, ticks_per_second):
+        seconds = self.bucket_ticks / ticks_per_second
+        return {
+            "count": self.count,
+            "mean_s": self.total / self.count / ticks_per_second if self.count else 0.0,
+            "p50_s": self.percentile(0.5) / ticks_per_second,
+            "p95_s": self.percentile(0.95) / ticks_per_second,
+            "max_s": self.max / ticks_per_second,
+            # Bucket start in seconds -> waits in it, empty buckets left out
+            "histogram": {f"{i * seconds:.2f}": count for i, count in enumerate(self.counts) if count},
+        }
+
+
+class _StationClock:
+    __slots__ = ("state", "since", "totals", "transitions")
+
+    def __init__(self, state, tick):
+        self.state = state
+        self.since = tick
+        self.totals = {}  # State -> ticks spent in it, not counting the current stretch
+        self.transitions = 0
+
+
+class SessionAnalytics:
+    def __init__(self, ticks_per_second=FPS):
+        self.ticks_per_second = ticks_per_second
+
+        # Customer outcomes
+        self.spawned = 0
+        self.turned_away = 0  # Arrived to a full line and never joined it
+        self.seated = 0
+        self.served = 0
+        self.left_seated = 0
+        self.left_in_line = 0
+
+        # Waits, in ticks: spawn to seat, seat to served, spawn to served
+        self.line_wait = WaitHistogram()
+        self.order_wait = WaitHistogram()
+        self.wait = WaitHistogram()
+
+        # Orders served per clock minute; only the current minute and the best one are kept
+        self.minute_ticks = 60 * ticks_per_second
+        self.minute = 0
+        self.minute_orders = 0
+        self.peak_minute_orders = 0
+
+        # Station name -> state clock
+        self.stations = {}
+
+    # Customer lifecycle
+
+    def customer_spawned(self):
+        self.spawned += 1
+
+    def customer_turned_away(self):
+        self.turned_away += 1
+
+    def order_visible(self, customer, tick):
+        self.seated += 1
+        self.line_wait.add(tick - customer.spawn_tick)
+
+    def customer_served(self, customer, tick):
+        self.served += 1
+        self.order_wait.add(tick - customer.seat_tick)
+        self.wait.add(tick - customer.spawn_tick)
+        minute = tick // self.minute_ticks
+        if minute != self.minute:
+            self.peak_minute_orders = max(self.peak_minute_orders, self.minute_orders)
+            self.minute = minute
+            self.minute_orders = 0
+        self.minute_orders += 1
+
+    def customer_left(self, customer, tick):
+        if customer.queued:
+            self.left_in_line += 1
+        else:
+            self.left_seated += 1
+
+    # Stations
+
+    def station(self, name, state, tick):
+        """Records that a station is in state as of tick; repeats of the current state are ignored"""
+        clock = self.stations.get(name)
+        if clock is None:
+            self.stations[name] = _StationClock(state, tick)
+            return
+        if state == clock.state:
+            return
+        clock.totals[clock.state] = clock.totals.get(clock.state, 0) + tick - clock.since
+        clock.state = state
+        clock.since = tick
+        clock.transitions += 1
+
+    # Reporting
+
+    def summary(self, tick):
+        """Aggregates as of tick, with times in seconds"""
+        tps = self.ticks_per_second
+        minutes = tick / self.minute_ticks
+        # Turned-away customers count as lost too, so a full line can't hide how many went unserved
+        lost = self.left_seated + self.left_in_line + self.turned_away
+        finished = self.served + lost
+
+        stations = {}
+        for name, clock in self.stations.items():
+            totals = dict(clock.totals)
+            totals[clock.state] = totals.get(clock.state, 0) + tick - clock.since
+            stations[name] = {
+                "state": clock.state,
+                "transitions": clock.transitions,
+                "idle_s": totals.get(IDLE, 0) / tps,
+                "idle_fraction": totals.get(IDLE, 0) / tick if tick else 0.0,
+                "seconds": {state: ticks / tps for state, ticks in totals.items()},
+            }
+
+        return {
+            "seconds": tick / tps,
+            "customers": {
+                "spawned": self.spawned,
+                "turned_away": self.turned_away,
+                "seated": self.seated,
+                "served": self.served,
+                "left_seated": self.left_seated,
+                "left_in_line": self.left_in_line,
+            },
+            "orders_per_minute": self.served / minutes if minutes else 0.0,
+            "peak_orders_per_minute": max(self.peak_minute_orders, self.minute_orders),
+            # Share of customers who left unserved, out of everyone whose visit is over
+            "abandonment_rate": lost / finished if finished else 0.0,
+            "wait": self.wait.stats(tps),
+            "line_wait": self.line_wait.stats(tps),
+            "order_wait": self.order_wait.stats(tps),
+            "stations": stations,
+        }
+
+    def format_lines(self, tick):
+        """Short human-readable version of summary() for the console"""
+        summary = self.summary(tick)
+        customers = summary["customers"]
+        wait = summary["wait"]
+        lines = [
+            f"{summary['orders_per_minute']:.2f} orders/min (peak {summary['peak_orders_per_minute']}), "
+            f"wait p50 {wait['p50_s']:.1f}s p95 {wait['p95_s']:.1f}s, "
+            f"{summary['abandonment_rate']:.0%} abandoned "
+            f"({customers['left_seated']} seated, {customers['left_in_line']} in line, "
+            f"{customers['turned_away']} turned away)",
+        ]
+        for name, station in summary["stations"].items():
+            lines.append(f"{name:<10}{station['idle_fraction']:6.0%} idle, {station['transitions']} transitions")
+        return lines
+
+    def write(self, path, tick, **session):
+        """Writes the summary, plus any session details (seed, level, score), as JSON"""
+        with open(path, "w") as f:
+            json.dump({**session, **self.summary(tick)}, f, indent=2)
+        print(f"SessionAnalytics: Wrote {path}")
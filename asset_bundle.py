@@ -0,0 +1,143 @@
+"""
+asset_bundle.py - Single-file asset bundle loaded with mmap
+
+A bundle is a small header, a JSON index, then 16-byte aligned blobs:
+images stored as raw RGBA at the exact size the game draws them, and audio
+stored as the original OGG bytes. Opening the bundle maps the file and the
+game builds surfaces straight from the mapped pixels with
+pygame.image.frombuffer, so there is no PNG inflate at startup.
+
+Build (or rebuild after changing resources):
+    python asset_bundle.py
+"""
+
+import io
+import os
+import json
+import mmap
+import struct
+import pygame
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, START_SCREEN_BG, RESTAURANT_BG
+
+BUNDLE_PATH = os.path.join("resources", "assets.bundle")
+MAGIC = b"PSB1"
+HEADER = struct.Struct("<4sI")  # magic, index length
+ALIGNMENT = 16
+
+_tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+
+
+def data_section_start(index_length):
+    """Blob offsets are relative to the data section, which starts aligned right after the index"""
+    start = HEADER.size + index_length
+    return start + -start % ALIGNMENT
+
+
+def image_key(path, size):
+    return f"{path}@{size[0]}x{size[1]}"
+
+
+class AssetBundle:
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        self.index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        self.data_start = data_section_start(index_length)
+        self.view = memoryview(self.map)
+
+    def has_image(self, path, size):
+        return image_key(path, size) in self.index["images"]
+
+    def has_audio(self, path):
+        return os.path.normpath(path) in self.index["audio"]
+
+    def image(self, path, size):
+        """Returns a surface over the mapped RGBA pixels, or None if the bundle doesn't have it"""
+        entry = self.index["images"].get(image_key(path, size))
+        if entry is None:
+            return None
+        offset, length = self.data_start + entry["offset"], entry["length"]
+        return pygame.image.frombuffer(self.view[offset:offset + length], tuple(size), "RGBA")
+
+    def audio(self, path):
+        """Returns a file-like object over the audio bytes, or None if the bundle doesn't have it"""
+        entry = self.index["audio"].get(os.path.normpath(path))
+        if entry is None:
+            return None
+        offset, length = self.data_start + entry["offset"], entry["length"]
+        return io.BytesIO(self.map[offset:offset + length])
+
+
+def load_bundle(path=BUNDLE_PATH):
+    """Returns the AssetBundle built by this script, or None if it hasn't been built"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return AssetBundle(path)
+    except Exception as e:
+        print(f"AssetBundle Error: Could not open {path}: {e}")
+        return None
+
+
+def bundle_manifest():
+    """Every (path, size) image variant the game draws"""
+    from simulation import RestaurantSimulation
+
+    screen_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+    manifest = [(START_SCREEN_BG, screen_size), (RESTAURANT_BG, screen_size)]
+    manifest += RestaurantSimulation().sprite_manifest()
+    return sorted(set(manifest))
+
+
+def audio_files(root=os.path.join("resources", "audio")):
+    for directory, _, names in sorted(os.walk(root)):
+        for name in sorted(names):
+            if name.endswith(".ogg"):
+                yield os.path.join(directory, name)
+
+
+def build_bundle(path=BUNDLE_PATH):
+    blobs = []
+    index = {"images": {}, "audio": {}}
+    offset = 0
+
+    def add(section, key, data, **extra):
+        nonlocal offset
+        index[section][key] = dict(offset=offset, length=len(data), **extra)
+        padding = -len(data) % ALIGNMENT
+        blobs.append(data + bytes(padding))
+        offset += len(data) + padding
+
+    for image_path, size in bundle_manifest():
+        try:
+            surface = pygame.transform.scale(pygame.image.load(image_path), size)
+        except Exception as e:
+            print(f"asset_bundle: Skipping {image_path}: {e}")
+            continue
+        add("images", image_key(image_path, size), _tobytes(surface, "RGBA"), size=list(size))
+
+    for audio_path in audio_files():
+        with open(audio_path, "rb") as f:
+            add("audio", os.path.normpath(audio_path), f.read())
+
+    index_bytes = json.dumps(index).encode()
+    header_length = HEADER.size + len(index_bytes)
+    data_start = data_section_start(len(index_bytes))
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(bytes(data_start - header_length))
+        for blob in blobs:
+            f.write(blob)
+    print(f"asset_bundle: Wrote {len(index['images'])} images and {len(index['audio'])} audio files "
+          f"to {path} ({(data_start + offset) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    build_bundle()
@@ -0,0 +1,84 @@
+import pygame
+
+
+class AssetCache:
+    def __init__(self):
+        # Decoded images keyed by path, scaled variants keyed by (path, size)
+        self.images = {}
+        self.scaled = {}
+        # Optional mmap'd bundle and pre-scaled sprite atlas, consulted before decoding loose files
+        self.bundle = None
+        self.atlas = None
+
+    def _convert(self, surface):
+        """Converts a surface to the display pixel format if a display exists"""
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha()
+
+    def load(self, path):
+        """Decodes an image from disk once and returns the unscaled surface"""
+        if path in self.images:
+            return self.images[path]
+        try:
+            surface = self._convert(pygame.image.load(path))
+        except Exception as e:
+            print(f"AssetCache Error: Could not load {path}: {e}")
+            surface = None
+        # Failed loads are cached too so we never retry the disk mid-game
+        self.images[path] = surface
+        return surface
+
+    def store(self, path, surface):
+        """Adds an image decoded elsewhere (e.g. on a loader thread), converting it here"""
+        self.images[path] = self._convert(surface) if surface is not None else None
+
+    def use_atlas(self, atlas):
+        self.atlas = atlas
+
+    def use_bundle(self, bundle):
+        self.bundle = bundle
+
+    def peek(self, path, size=None):
+        """Like get, but returns None instead of touching the disk if it isn't loaded yet"""
+        if path in self.images:
+            return self.get(path, size)
+        if size is not None:
+            if (path, tuple(size)) in self.scaled or (self.bundle and self.bundle.has_image(path, size)):
+                return self.get(path, size)
+        return None
+
+    def get(self, path, size=None):
+        """Returns the image at path scaled to size, or None if it can't be loaded"""
+        if not path:
+            return None
+        if size is None:
+            return self.load(path)
+        key = (path, tuple(size))
+        if key in self.scaled:
+            return self.scaled[key]
+        if self.bundle is not None:
+            # Raw RGBA straight from the mapped file, converting copies it into the display format
+            image = self.bundle.image(path, key[1])
+            if image is not None:
+                image = self._convert(image)
+                self.scaled[key] = image
+                return image
+        if self.atlas is not None:
+            image = self.atlas.get(path, key[1])
+            if image is not None:
+                self.scaled[key] = image
+                return image
+        image = self.load(path)
+        if image is not None:
+            image = pygame.transform.scale(image, key[1])
+        self.scaled[key] = image
+        return image
+
+    def preload(self, paths, size=None):
+        for path in paths:
+            self.get(path, size)
+
+
+# Shared cache used by every entity
+assets = AssetCache()
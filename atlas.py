@@ -0,0 +1,48 @@
+import os
+import json
+import pygame
+
+ATLAS_INDEX = os.path.join("resources", "atlas", "sprites.json")
+
+
+class TextureAtlas:
+    def __init__(self, index_path=ATLAS_INDEX):
+        with open(index_path) as f:
+            index = json.load(f)
+        self.image_path = os.path.join(os.path.dirname(index_path), index["image"])
+        # "path@WxH" -> rect inside the atlas image
+        self.frames = {key: pygame.Rect(rect) for key, rect in index["frames"].items()}
+        self.surface = None
+
+    @staticmethod
+    def key(path, size):
+        return f"{path}@{size[0]}x{size[1]}"
+
+    def covers(self, path, size):
+        return self.key(path, size) in self.frames
+
+    def attach(self, surface):
+        """Sets the decoded atlas image, converting it to the display format if there is one"""
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.surface = surface
+
+    def get(self, path, size):
+        """Returns a subsurface view of the packed sprite, or None if it isn't in the atlas"""
+        if self.surface is None:
+            return None
+        rect = self.frames.get(self.key(path, size))
+        if rect is None:
+            return None
+        return self.surface.subsurface(rect)
+
+
+def load_atlas(index_path=ATLAS_INDEX):
+    """Returns the TextureAtlas built by build_atlas.py, or None if it hasn't been built"""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        return TextureAtlas(index_path)
+    except Exception as e:
+        print(f"TextureAtlas Error: Could not read {index_path}: {e}")
+        return None
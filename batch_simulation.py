@@ -0,0 +1,164 @@
+"""
+batch_simulation.py - Vectorized simulator for many restaurant shifts at once
+
+Holds N independent restaurants as NumPy arrays and advances them all in
+lock-step using the per-tick rules from simulation.py: a customer leaves on the
+tick their patience would reach 0 at 0.05 per tick, worked out as an exact
+deadline like Customer.arrive, a dish is done after cook_time ticks and a
+customer spawns every customer_spawn_delay ticks into one of the seats.
+
+The kitchen is abstracted to a single chef working the oldest waiting order:
+prep_ticks of walking and assembly, then cook_time on the stove, then the dish
+goes to that customer if they are still seated. That is enough to sweep
+difficulty settings across thousands of configurations in seconds.
+"""
+
+import argparse
+import itertools
+import time
+import numpy as np
+
+PATIENCE_DECAY = 0.05
+NO_JOB = -1
+
+
+class BatchSimulation:
+    def __init__(self, n, cook_time=180, customer_spawn_delay=600, max_patience=200.0, prep_ticks=420, seats=3):
+        # Every setting can be a scalar or a per-restaurant array of length n
+        self.n = n
+        self.seats = seats
+        self.cook_time = np.broadcast_to(np.asarray(cook_time, dtype=np.int64), (n,)).copy()
+        self.customer_spawn_delay = np.broadcast_to(np.asarray(customer_spawn_delay, dtype=np.int64), (n,)).copy()
+        self.max_patience = np.broadcast_to(np.asarray(max_patience, dtype=np.float64), (n,)).copy()
+        self.prep_ticks = np.broadcast_to(np.asarray(prep_ticks, dtype=np.int64), (n,)).copy()
+        # Ticks from arrival to leaving; same tolerance as Customer.arrive so e.g. 50 / 0.05 lands on 1000
+        self.patience_ticks = np.ceil(self.max_patience / PATIENCE_DECAY - 1e-9).astype(np.int64)
+
+        self.tick = 0
+
+        # Seats
+        self.occupied = np.zeros((n, seats), dtype=bool)
+        self.leave_tick = np.zeros((n, seats), dtype=np.int64)
+        self.arrival = np.zeros((n, seats), dtype=np.int64)
+
+        # Kitchen - the seat being cooked for, who sat there and ticks left on the job
+        self.job_seat = np.full(n, NO_JOB, dtype=np.int64)
+        self.job_arrival = np.zeros(n, dtype=np.int64)
+        self.job_timer = np.zeros(n, dtype=np.int64)
+
+        self.customer_spawn_timer = np.zeros(n, dtype=np.int64)
+
+        # Results
+        self.score = np.zeros(n, dtype=np.int64)
+        self.orders_completed = np.zeros(n, dtype=np.int64)
+        self.customers_lost = np.zeros(n, dtype=np.int64)
+        self.dishes_wasted = np.zeros(n, dtype=np.int64)
+        self.total_wait = np.zeros(n, dtype=np.int64)
+
+        # The first customer walks in when the shift starts
+        self._spawn(np.ones(n, dtype=bool))
+
+    def _spawn(self, due):
+        free = ~self.occupied
+        can_seat = due & free.any(axis=1)
+        rows = np.nonzero(can_seat)[0]
+        seats = free[rows].argmax(axis=1)  # First free seat, like spawn_customer
+        self.occupied[rows, seats] = True
+        self.leave_tick[rows, seats] = self.tick + self.patience_ticks[rows]
+        self.arrival[rows, seats] = self.tick
+
+    def step(self):
+        """Advances every restaurant by one tick"""
+        self.tick += 1
+
+        # Update cooking
+        busy = self.job_seat != NO_JOB
+        self.job_timer -= busy
+        done = np.nonzero(busy & (self.job_timer <= 0))[0]
+        if done.size:
+            seats = self.job_seat[done]
+            present = self.occupied[done, seats] & (self.arrival[done, seats] == self.job_arrival[done])
+            served, served_seats = done[present], seats[present]
+            # Patience left, from the deadline like Customer.patience_at, truncated like the game's bonus
+            patience = np.maximum(0, self.leave_tick[served, served_seats] - self.tick) * PATIENCE_DECAY
+            self.score[served] += 100 + patience.astype(np.int64)
+            self.orders_completed[served] += 1
+            self.total_wait[served] += self.tick - self.arrival[served, served_seats]
+            self.occupied[served, served_seats] = False
+            self.dishes_wasted[done[~present]] += 1
+            self.job_seat[done] = NO_JOB
+
+        # Customers whose deadline has come leave
+        leaving = self.occupied & (self.tick >= self.leave_tick)
+        if leaving.any():
+            self.customers_lost += leaving.sum(axis=1)
+            self.occupied &= ~leaving
+
+        # Spawn new customers
+        self.customer_spawn_timer += 1
+        due = self.customer_spawn_timer >= self.customer_spawn_delay
+        if due.any():
+            self.customer_spawn_timer[due] = 0
+            self._spawn(due)
+
+        # Idle kitchens start on the oldest waiting order
+        idle = self.job_seat == NO_JOB
+        idle &= self.occupied.any(axis=1)
+        rows = np.nonzero(idle)[0]
+        if rows.size:
+            waiting_since = np.where(self.occupied[rows], self.arrival[rows], np.iinfo(np.int64).max)
+            seats = waiting_since.argmin(axis=1)
+            self.job_seat[rows] = seats
+            self.job_arrival[rows] = self.arrival[rows, seats]
+            self.job_timer[rows] = self.prep_ticks[rows] + self.cook_time[rows]
+
+    def run(self, ticks):
+        for _ in range(ticks):
+            self.step()
+        return self.results()
+
+    def results(self):
+        served = np.maximum(self.orders_completed, 1)
+        return {
+            "cook_time": self.cook_time,
+            "customer_spawn_delay": self.customer_spawn_delay,
+            "max_patience": self.max_patience,
+            "prep_ticks": self.prep_ticks,
+            "score": self.score,
+            "orders_completed": self.orders_completed,
+            "customers_lost": self.customers_lost,
+            "dishes_wasted": self.dishes_wasted,
+            "mean_wait_ticks": np.where(self.orders_completed > 0, self.total_wait / served, 0.0),
+        }
+
+
+def sweep(cook_times, spawn_delays, patiences, prep_ticks=(420,), seats=3):
+    """Builds one BatchSimulation covering every combination of the given settings"""
+    grid = np.array(list(itertools.product(cook_times, spawn_delays, patiences, prep_ticks)), dtype=np.float64)
+    return BatchSimulation(len(grid), cook_time=grid[:, 0].astype(np.int64),
+                           customer_spawn_delay=grid[:, 1].astype(np.int64),
+                           max_patience=grid[:, 2], prep_ticks=grid[:, 3].astype(np.int64), seats=seats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep difficulty settings with the vectorized simulator")
+    parser.add_argument("--ticks", type=int, default=3 * 60 * 60, help="ticks per shift (60 per second)")
+    parser.add_argument("--cook-time", type=int, nargs="+", default=list(range(60, 361, 12)))
+    parser.add_argument("--spawn-delay", type=int, nargs="+", default=list(range(180, 901, 30)))
+    parser.add_argument("--max-patience", type=float, nargs="+", default=list(range(50, 301, 25)))
+    parser.add_argument("--prep-ticks", type=int, nargs="+", default=[300, 420, 540])
+    parser.add_argument("--top", type=int, default=10, help="how many of the best configurations to print")
+    args = parser.parse_args()
+
+    batch = sweep(args.cook_time, args.spawn_delay, args.max_patience, args.prep_ticks)
+    start = time.perf_counter()
+    results = batch.run(args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {batch.n} shifts of {args.ticks} ticks in {elapsed:.2f}s")
+
+    print("cook_time spawn_delay max_patience prep_ticks    score orders lost mean_wait_ticks")
+    for i in np.argsort(-results["score"])[:args.top]:
+        print(f"{results['cook_time'][i]:9d} {results['customer_spawn_delay'][i]:11d} "
+              f"{results['max_patience'][i]:12.0f} {results['prep_ticks'][i]:10d} "
+              f"{results['score'][i]:8d} {results['orders_completed'][i]:6d} "
+              f"{results['customers_lost'][i]:4d} {results['mean_wait_ticks'][i]:15.1f}")
@@ -0,0 +1,147 @@
+"""
+bench_render.py - Rendering benchmark for the Vietnamese Restaurant Game
+
+Drives the real draw_game / draw_menu paths offscreen through SDL's dummy
+video driver on a set of stress scenes and reports frames per second and
+the transient Python memory each frame allocates.
+
+Run from the repository root:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --frames 300 --json bench.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Asset paths are relative to the repository root
+
+import pygame
+from viet_restaurant import VietnameseRestaurantGame, GAME
+from constants import RED
+from simulation import PATIENCE_DECAY
+
+
+def add_customers(game, count):
+    """Seats count customers in a grid over the dining room, ignoring the 3 seat limit"""
+    sim = game.sim
+    dishes = list(sim.dishes.values())
+    sprites = sim.level.customer_sprites
+    for i in range(count):
+        x = 520 + (i % 10) * 65
+        y = 120 + (i // 10) % 6 * 110
+        customer = sim.customer_class(f"Guest{i}", RED, dishes[i % len(dishes)], x, y,
+                                      sprites[i % len(sprites)])
+        sim.add_customer(customer)
+        # Spread the patience bars out; the sim never ticks here, so moving the deadline is enough
+        customer.leave_tick = sim.tick + customer.max_patience / PATIENCE_DECAY * (i % 4 + 1) / 4
+
+
+def fill_stations(game):
+    sim = game.sim
+    order = next(iter(sim.dishes.values()))
+    for station in (sim.prep_station, sim.cook_station, sim.serve_station):
+        station.set_ingredients(list(order))
+    sim.cook_station.start_cooking(sim.tick - sim.cook_station.cook_time // 2)
+
+
+def show_every_hint(game):
+    # A player rect covering the whole floor is near every station at once
+    sim = game.sim
+    sim.player.held_ingredient = None
+    sim.player.rect.update(0, 0, 1200, 800)
+
+
+def long_message(game):
+    game.sim.show_message("Perfect! " * 12 + "+9999 points!")
+    game.sim.message_until = 10 ** 9
+
+
+SCENES = {
+    "menu": [],
+    "customers_3": [lambda g: add_customers(g, 3)],
+    "customers_30": [lambda g: add_customers(g, 30)],
+    "customers_300": [lambda g: add_customers(g, 300)],
+    "stations_full": [lambda g: add_customers(g, 3), fill_stations],
+    "all_hints": [lambda g: add_customers(g, 3), show_every_hint],
+    "long_message": [lambda g: add_customers(g, 3), long_message],
+    "everything": [lambda g: add_customers(g, 30), fill_stations, show_every_hint, long_message],
+}
+
+
+def build_scene(name):
+    game = VietnameseRestaurantGame(seed=0)
+    game.finish_loading()
+    if name != "menu":
+        game.state = GAME
+        for setup in SCENES[name]:
+            setup(game)
+    return game
+
+
+def render_frame(game):
+    if game.state == GAME:
+        game.draw_game()
+    else:
+        game.draw_menu()
+    game.dirty_rects.present()
+
+
+def bench_scene(name, frames):
+    game = build_scene(name)
+
+    # Warm up caches (static layer, text surfaces) before measuring
+    for _ in range(10):
+        render_frame(game)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        render_frame(game)
+    elapsed = time.perf_counter() - start
+
+    # Allocation pass, kept separate because tracing slows everything down
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(frames, 50)):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        render_frame(game)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    return {
+        "scene": name,
+        "frames": frames,
+        "fps": frames / elapsed,
+        "ms_per_frame": elapsed / frames * 1000,
+        "alloc_kib_per_frame": sum(peaks) / len(peaks) / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark draw_game / draw_menu on stress scenes")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--scene", nargs="+", choices=sorted(SCENES), default=list(SCENES))
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'scene':<16}{'fps':>10}{'ms/frame':>10}{'alloc KiB/frame':>17}")
+    for name in args.scene:
+        result = bench_scene(name, args.frames)
+        results.append(result)
+        print(f"{name:<16}{result['fps']:10.1f}{result['ms_per_frame']:10.3f}{result['alloc_kib_per_frame']:17.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    pygame.quit()
@@ -0,0 +1,71 @@
+"""
+build_atlas.py - Packs every in-game sprite variant into one texture atlas
+
+Each sprite in the simulation's sprite manifest is scaled to the size it is
+drawn at (80x80 stations, 60x80 customers, 120x100 cooking stations, 30x30
+held icons, ...) with the same pygame.transform.scale the game uses, then
+shelf-packed into resources/atlas/sprites.png. resources/atlas/sprites.json
+maps "path@WxH" to the rect it was packed into.
+
+Re-run this after adding or changing sprites:
+    python build_atlas.py
+"""
+
+import os
+import json
+import argparse
+import pygame
+
+from simulation import RestaurantSimulation
+from atlas import ATLAS_INDEX, TextureAtlas
+
+ATLAS_IMAGE = os.path.join("resources", "atlas", "sprites.png")
+PADDING = 1
+
+
+def shelf_pack(sizes, width):
+    """Places (w, h) boxes left to right on shelves, tallest first; returns positions and total height"""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            # Start a new shelf
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def build_atlas(width=512, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    manifest = sorted(set(RestaurantSimulation().sprite_manifest()))
+    sprites = []
+    for path, size in manifest:
+        try:
+            sprites.append((path, size, pygame.transform.scale(pygame.image.load(path), size)))
+        except Exception as e:
+            print(f"build_atlas: Skipping {path}: {e}")
+
+    positions, height = shelf_pack([size for _, size, _ in sprites], width)
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    frames = {}
+    for (path, size, surface), (x, y) in zip(sprites, positions):
+        atlas.blit(surface, (x, y))
+        frames[TextureAtlas.key(path, size)] = [x, y, size[0], size[1]]
+
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    pygame.image.save(atlas, image_path)
+    with open(index_path, "w") as f:
+        json.dump({"image": os.path.basename(image_path), "frames": frames}, f, indent=2, sort_keys=True)
+    print(f"build_atlas: Packed {len(frames)} sprites into {width}x{height} {image_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack sprites into a texture atlas")
+    parser.add_argument("--width", type=int, default=512)
+    args = parser.parse_args()
+    build_atlas(args.width)
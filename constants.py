@@ -0,0 +1,26 @@
+# Constants
+SCREEN_WIDTH = 1200
+SCREEN_HEIGHT = 800
+FPS = 60
+
+# Sprite sizes that aren't tied to an entity's own width/height
+CUSTOMER_SIZE = (60, 80)
+HELD_ICON_SIZE = (30, 30)
+
+# Full-screen backgrounds
+START_SCREEN_BG = "resources/sprites/start_screen_bg.png"
+RESTAURANT_BG = "resources/sprites/restaurant_background.png"
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BROWN = (139, 90, 43)
+LIGHT_BROWN = (205, 133, 63)
+RED = (220, 20, 60)
+GREEN = (34, 139, 34)
+YELLOW = (255, 215, 0)
+LIGHT_BLUE = (173, 216, 230)
+DARK_GREEN = (0, 100, 0)
+CREAM = (255, 253, 208)
+GRAY = (128, 128, 128)
+ORANGE = (255, 165, 0)
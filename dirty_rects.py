@@ -0,0 +1,55 @@
+import pygame
+
+
+class DirtyRectTracker:
+    def __init__(self, screen_size, enabled=True):
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.enabled = enabled
+        # Rects covered by dynamic entities last frame and this frame
+        self.previous = []
+        self.current = []
+        self.full_redraw = True
+
+    def add(self, rect):
+        if self.enabled:
+            self.current.append(pygame.Rect(rect).clip(self.screen_rect))
+
+    def invalidate(self):
+        """Forces the next flush to push the whole window"""
+        self.full_redraw = True
+
+    def flush(self):
+        """Returns the rects to push this frame and rolls this frame over to last frame"""
+        if self.full_redraw:
+            rects = [self.screen_rect.copy()]
+        else:
+            rects = merge_rects(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
+        self.full_redraw = False
+        return rects
+
+    def present(self):
+        if self.enabled:
+            pygame.display.update(self.flush())
+        else:
+            pygame.display.flip()
+
+
+def merge_rects(rects):
+    """Unions overlapping rects so no pixel gets pushed twice"""
+    merged = []
+    for rect in rects:
+        if not rect.w or not rect.h:
+            continue
+        rect = rect.copy()
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                # Absorb the overlapping rect and rescan, the union may now touch earlier ones
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
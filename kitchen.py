@@ -0,0 +1,155 @@
+"""
+kitchen.py - Cooking pipeline between the prep station and the pass
+
+Finished prep batches become cook jobs in a FIFO queue. The kitchen hands
+them to whichever burner (cook station) is idle, and each burner finishes on
+a COOK_DONE timer. Cooked plates go to the pass, a small buffer whose front
+plate is shown on the serve station. When the pass is full a burner holds on
+to its plate, blocked, until something is served.
+
+The kitchen also keeps the numbers needed to find the bottleneck: how busy
+and how blocked each burner was, how long jobs waited for a burner, and how
+long plates waited on the pass. Burner and pass state changes are also
+reported to the session analytics.
+"""
+
+from collections import deque
+
+from analytics import IDLE
+
+
+class Plate:
+    """A batch of ingredients moving through the kitchen, and the tick it joined its current queue"""
+    __slots__ = ("ingredients", "mask", "count", "since")
+
+    def __init__(self, ingredients, mask, count, since):
+        self.ingredients = ingredients
+        self.mask = mask
+        self.count = count
+        self.since = since
+
+
+class Kitchen:
+    def __init__(self, burners, serve_station, timers, cook_done, analytics, pass_capacity=3):
+        self.burners = burners
+        self.serve_station = serve_station  # Shows the plate at the front of the pass
+        self.timers = timers
+        self.cook_done = cook_done  # Timer kind to schedule for finished burners
+        self.pass_capacity = pass_capacity
+        self.analytics = analytics
+        self.names = {burner: f"burner {i}" for i, burner in enumerate(burners)}
+        for burner in burners:
+            analytics.station(self.names[burner], IDLE, 0)
+        analytics.station("pass", IDLE, 0)
+
+        self.jobs = deque()  # Plates waiting for a burner
+        self.idle = list(reversed(burners))  # Free burners as a stack, first burner on top
+        self.blocked = deque()  # Burners holding a cooked plate because the pass is full
+        self.ready = deque()  # The pass, front plate first
+
+        # Metrics
+        self.busy_ticks = {burner: 0 for burner in burners}
+        self.blocked_ticks = {burner: 0 for burner in burners}
+        self.jobs_cooked = {burner: 0 for burner in burners}
+        self.started = {}
+        self.blocked_since = {}
+        self.jobs_started = 0
+        self.queue_wait_ticks = 0
+        self.max_queue_wait = 0
+        self.plates_served = 0
+        self.pass_wait_ticks = 0
+
+    def submit(self, station, tick):
+        """Moves a station's batch into the job queue; returns True if a burner took it straight away"""
+        self.jobs.append(Plate(*station.unload(), tick))
+        self.dispatch(tick)
+        return not self.jobs
+
+    def dispatch(self, tick):
+        while self.jobs and self.idle:
+            plate = self.jobs.popleft()
+            burner = self.idle.pop()
+            burner.load(plate.ingredients, plate.mask, plate.count)
+            self.timers.schedule(burner.start_cooking(tick), self.cook_done, burner)
+            self.started[burner] = tick
+            self.analytics.station(self.names[burner], "cooking", tick)
+            wait = tick - plate.since
+            self.jobs_started += 1
+            self.queue_wait_ticks += wait
+            self.max_queue_wait = max(self.max_queue_wait, wait)
+
+    def finish(self, burner, tick):
+        """Called when a burner's COOK_DONE fires; returns the plate if it made it onto the pass"""
+        burner.cooking = False
+        self.busy_ticks[burner] += tick - self.started.pop(burner) + 1
+        self.jobs_cooked[burner] += 1
+        if len(self.ready) >= self.pass_capacity:
+            self.blocked.append(burner)
+            self.blocked_since[burner] = tick
+            self.analytics.station(self.names[burner], "blocked", tick)
+            return None
+        plate = self._to_pass(burner, tick)
+        self.dispatch(tick)
+        return plate
+
+    def _to_pass(self, burner, tick):
+        plate = Plate(*burner.unload(), tick)
+        self.ready.append(plate)
+        self.idle.append(burner)
+        self.analytics.station(self.names[burner], IDLE, tick)
+        if len(self.ready) == 1:
+            self._show_front(tick)
+        return plate
+
+    def _show_front(self, tick):
+        if self.ready:
+            front = self.ready[0]
+            # The serve station shows the plate's own list; clear() swaps it out rather than emptying it
+            self.serve_station.load(front.ingredients, front.mask, front.count)
+            self.analytics.station("pass", "holding", tick)
+        else:
+            self.serve_station.clear()
+            self.analytics.station("pass", IDLE, tick)
+
+    def take(self, plate, tick):
+        """Removes a served plate from the pass and lets blocked burners move up"""
+        front = plate is self.ready[0]
+        self.ready.remove(plate)
+        self.plates_served += 1
+        self.pass_wait_ticks += tick - plate.since
+        while self.blocked and len(self.ready) < self.pass_capacity:
+            burner = self.blocked.popleft()
+            self.blocked_ticks[burner] += tick - self.blocked_since.pop(burner)
+            self._to_pass(burner, tick)
+        if front:
+            self._show_front(tick)
+        self.dispatch(tick)
+
+    def in_flight(self):
+        """Ingredient masks of every plate queued, cooking, blocked or on the pass"""
+        masks = [plate.mask for plate in self.jobs]
+        masks += [burner.mask for burner in self.burners if burner.count]
+        masks += [plate.mask for plate in self.ready]
+        return masks
+
+    def report(self, tick):
+        """Per-burner utilization and queue waits as of tick"""
+        elapsed = max(tick, 1)
+        burners = []
+        for i, burner in enumerate(self.burners):
+            busy = self.busy_ticks[burner]
+            if burner in self.started:
+                busy += tick - self.started[burner] + 1
+            blocked = self.blocked_ticks[burner]
+            if burner in self.blocked_since:
+                blocked += tick - self.blocked_since[burner]
+            burners.append(dict(burner=i, jobs=self.jobs_cooked[burner], utilization=busy / elapsed,
+                                blocked=blocked / elapsed))
+        return dict(
+            burners=burners,
+            jobs_queued=len(self.jobs),
+            mean_queue_wait=self.queue_wait_ticks / self.jobs_started if self.jobs_started else 0.0,
+            max_queue_wait=self.max_queue_wait,
+            plates_on_pass=len(self.ready),
+            mean_pass_wait=self.pass_wait_ticks / self.plates_served if self.plates_served else 0.0,
+        )
@@ -0,0 +1,30 @@
+import pygame
+
+
+class LayeredRenderer:
+    def __init__(self, size):
+        self.size = size
+        # Composited static layers (background, stations) and the key they were baked with
+        self.static_surface = None
+        self.static_key = None
+        self.rebuilds = 0
+
+    def invalidate(self):
+        self.static_key = None
+
+    def draw_static(self, screen, key, bake):
+        """Blits the cached static layer, re-baking it with bake(surface) when key changes"""
+        if self.static_surface is None:
+            self.static_surface = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                self.static_surface = self.static_surface.convert()
+            self.static_key = None
+
+        rebuilt = key != self.static_key
+        if rebuilt:
+            bake(self.static_surface)
+            self.static_key = key
+            self.rebuilds += 1
+
+        screen.blit(self.static_surface, (0, 0))
+        return rebuilt
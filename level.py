@@ -0,0 +1,241 @@
+"""
+level.py - Kitchen layouts and menus loaded from resources/levels
+
+A level file is JSON describing the player start, the ingredient stations,
+the prep/cook/serve stations, the menu and where customers sit (see
+resources/levels/pho_so_2.json). load_level validates it and compiles it
+into a Level with the lookup tables the simulation needs precomputed, then
+pickles that next to the source in a .cache directory so later runs skip
+parsing and validation until the JSON changes.
+"""
+
+import os
+import json
+import pickle
+import tempfile
+
+import constants
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+LEVEL_DIR = os.path.join("resources", "levels")
+DEFAULT_LEVEL = os.path.join(LEVEL_DIR, "pho_so_2.json")
+CACHE_DIR = ".cache"
+# Bump whenever Level's fields change so stale caches get recompiled
+COMPILER_VERSION = 4
+
+STATION_TYPES = ("prep", "cook", "serve")
+
+
+class Level:
+    """Compiled, ready-to-use level; built by compile_level, never edited afterwards"""
+
+    def __init__(self, name, player, ingredients, stations, dishes, customer_names, customer_colors,
+                 customer_sprites, seats, line_capacity=0, spawn_delay=600, pass_capacity=3):
+        self.name = name
+        self.player = player  # (x, y, sprite path)
+        self.ingredients = ingredients  # (name, x, y, color, sprite path) per ingredient station
+        self.stations = stations  # "prep"/"serve" -> (x, y, sprite path), "cook" -> list of them, one per burner
+        self.pass_capacity = pass_capacity  # Cooked plates the pass holds before burners have to wait
+        self.dishes = dishes  # dish name -> ingredient list, in menu order
+        self.customer_names = customer_names
+        self.customer_colors = customer_colors
+        self.customer_sprites = customer_sprites
+        self.seats = seats
+        self.line_capacity = line_capacity  # Customers who may queue off-screen once every seat is taken
+        self.spawn_delay = spawn_delay  # Ticks between arrivals
+
+        # Lookup tables
+        self.dish_names = list(dishes)
+        self.sprite_map = {name: sprite for name, _, _, _, sprite in ingredients}
+        self.ingredient_bits = {name: 1 << i for i, (name, *_) in enumerate(ingredients)}
+        self.dish_masks = {dish: self.mask(order) for dish, order in dishes.items()}
+        # Recipe index: what a plate contains, regardless of order, -> the dish it makes
+        self.recipes = {mask: dish for dish, mask in self.dish_masks.items()}
+
+    def mask(self, ingredient_names):
+        """Bitmask of a collection of ingredient names; -1 if any of them isn't in this level"""
+        bits = self.ingredient_bits
+        mask = 0
+        for name in ingredient_names:
+            bit = bits.get(name)
+            if bit is None:
+                return -1
+            mask |= bit
+        return mask
+
+
+def _color(value, where):
+    if isinstance(value, str):
+        color = getattr(constants, value, None)
+        if not (isinstance(color, tuple) and len(color) == 3):
+            raise ValueError(f"{where}: unknown color {value!r}")
+        return color
+    if isinstance(value, list) and len(value) == 3 and all(isinstance(c, int) and 0 <= c <= 255 for c in value):
+        return tuple(value)
+    raise ValueError(f"{where}: color must be a constants.py name or [r, g, b], got {value!r}")
+
+
+def _position(entry, where):
+    x, y = entry.get("x"), entry.get("y")
+    if not (isinstance(x, int) and isinstance(y, int)):
+        raise ValueError(f"{where}: x and y must be integers")
+    if not (0 <= x < SCREEN_WIDTH and 0 <= y < SCREEN_HEIGHT):
+        raise ValueError(f"{where}: ({x}, {y}) is off screen")
+    return x, y
+
+
+def _sprite(entry, where):
+    sprite = entry.get("sprite")
+    if sprite is not None and not isinstance(sprite, str):
+        raise ValueError(f"{where}: sprite must be a path")
+    return sprite
+
+
+def _require(data, key, kind, where):
+    value = data.get(key)
+    if not isinstance(value, kind) or not value:
+        raise ValueError(f"{where}: '{key}' is missing or empty")
+    return value
+
+
+def compile_level(data, source="<level>"):
+    """Validates parsed level JSON and returns the Level it describes"""
+    name = data.get("name", os.path.splitext(os.path.basename(source))[0])
+
+    player_data = _require(data, "player", dict, source)
+    player = (*_position(player_data, f"{source} player"), _sprite(player_data, f"{source} player"))
+
+    ingredients = []
+    for i, entry in enumerate(_require(data, "ingredients", list, source)):
+        where = f"{source} ingredients[{i}]"
+        ingredient = entry.get("name")
+        if not isinstance(ingredient, str) or not ingredient:
+            raise ValueError(f"{where}: missing name")
+        if any(ingredient == existing[0] for existing in ingredients):
+            raise ValueError(f"{where}: duplicate ingredient {ingredient!r}")
+        ingredients.append((ingredient, *_position(entry, where), _color(entry.get("color"), where),
+                            _sprite(entry, where)))
+
+    station_data = _require(data, "stations", dict, source)
+    stations = {}
+    for station_type in STATION_TYPES:
+        entry = station_data.get(station_type)
+        if station_type == "cook" and isinstance(entry, list) and entry:
+            # Several burners
+            stations["cook"] = [(*_position(burner, f"{source} stations.cook[{i}]"),
+                                 _sprite(burner, f"{source} stations.cook[{i}]"))
+                                for i, burner in enumerate(entry) if isinstance(burner, dict)]
+            if len(stations["cook"]) != len(entry):
+                raise ValueError(f"{source} stations.cook: every burner must be an object")
+            continue
+        if not isinstance(entry, dict):
+            raise ValueError(f"{source}: missing '{station_type}' station")
+        where = f"{source} stations.{station_type}"
+        stations[station_type] = (*_position(entry, where), _sprite(entry, where))
+        if station_type == "cook":
+            stations["cook"] = [stations["cook"]]
+    pass_capacity = station_data["serve"].get("capacity", 3)
+    if not isinstance(pass_capacity, int) or pass_capacity < 1:
+        raise ValueError(f"{source} stations.serve.capacity: must be at least 1")
+
+    known = {ingredient[0] for ingredient in ingredients}
+    dishes = {}
+    for dish, order in _require(data, "dishes", dict, source).items():
+        if not isinstance(order, list) or not order:
+            raise ValueError(f"{source} dishes.{dish}: needs a list of ingredients")
+        unknown = [ingredient for ingredient in order if ingredient not in known]
+        if unknown:
+            raise ValueError(f"{source} dishes.{dish}: unknown ingredients {unknown}")
+        if len(set(order)) != len(order):
+            raise ValueError(f"{source} dishes.{dish}: lists an ingredient twice")
+        same = [other for other, other_order in dishes.items() if set(other_order) == set(order)]
+        if same:
+            raise ValueError(f"{source} dishes.{dish}: same ingredients as {same[0]}")
+        dishes[dish] = list(order)
+
+    customer_data = _require(data, "customers", dict, source)
+    where = f"{source} customers"
+    names = _require(customer_data, "names", list, where)
+    colors = [_color(color, f"{where}.colors[{i}]")
+              for i, color in enumerate(_require(customer_data, "colors", list, where))]
+    sprites = _require(customer_data, "sprites", list, where)
+    seats = []
+    for i, seat in enumerate(_require(customer_data, "seats", list, where)):
+        if not (isinstance(seat, list) and len(seat) == 2):
+            raise ValueError(f"{where}.seats[{i}]: must be [x, y]")
+        seat = _position({"x": seat[0], "y": seat[1]}, f"{where}.seats[{i}]")
+        if seat in seats:
+            raise ValueError(f"{where}.seats[{i}]: duplicate seat {seat}")
+        seats.append(seat)
+
+    line_capacity = customer_data.get("line", 0)
+    if not isinstance(line_capacity, int) or line_capacity < 0:
+        raise ValueError(f"{where}.line: must be a whole number of customers")
+    spawn_delay = customer_data.get("spawn_delay", 600)
+    if not isinstance(spawn_delay, int) or spawn_delay <= 0:
+        raise ValueError(f"{where}.spawn_delay: must be a positive number of ticks")
+
+    return Level(name, player, ingredients, stations, dishes, list(names), colors, list(sprites), seats,
+                 line_capacity, spawn_delay, pass_capacity)
+
+
+def _cache_path(path):
+    return os.path.join(os.path.dirname(path), CACHE_DIR, os.path.basename(path) + ".pickle")
+
+
+_loaded = {}
+
+
+def load_level(path=DEFAULT_LEVEL):
+    """Returns the compiled Level for a level file, from memory or the disk cache when it is current"""
+    stat = os.stat(path)
+    stamp = (COMPILER_VERSION, stat.st_mtime_ns, stat.st_size)
+
+    cached = _loaded.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    cache_path = _cache_path(path)
+    level = None
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, cached_level = pickle.load(f)
+        if cached_stamp == stamp:
+            level = cached_level
+    except Exception:
+        pass  # Missing, stale or torn caches just get recompiled
+
+    if level is None:
+        with open(path, encoding="utf-8") as f:
+            level = compile_level(json.load(f), path)
+        temp_path = None
+        try:
+            # Sweep workers load levels concurrently, so write aside and swap the finished file in
+            cache_dir = os.path.dirname(cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+                temp_path = f.name
+                pickle.dump((stamp, level), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            print(f"Level Warning: Could not cache {path}: {e}")
+
+    _loaded[path] = (stamp, level)
+    return level
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate and compile level files")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_LEVEL])
+    args = parser.parse_args()
+    for level_path in args.paths:
+        level = load_level(level_path)
+        print(f"{level_path}: {level.name}, {len(level.ingredients)} ingredients, {len(level.dishes)} dishes, "
+              f"{len(level.seats)} seats, line of {level.line_capacity}, {len(level.stations['cook'])} burners")
@@ -1,54 +1,147 @@
-import pygame
-import random
+import io
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from sfx_pool import SfxPool
+
+# Posted by the mixer when a track ends, and by the prefetch thread once the next track is in memory
+MUSIC_END = pygame.event.custom_type()
+MUSIC_PREFETCHED = pygame.event.custom_type()
+
 
 class MusicManager:
-    def __init__(self):
+    def __init__(self, rng=None, preload_sfx=True, bundle=None):
         # --- MUSIC SETUP ---
+        self.bundle = bundle  # Optional AssetBundle to read audio from instead of loose files
         self.music_tracks = ["clarity.ogg", "soft_spot.ogg", "con_gai_mien_tay.ogg", "wantchu.ogg", "war.ogg"]
         self.current_track_index = 0
-        random.shuffle(self.music_tracks)
+        # Pass a seeded random.Random to get the same playlist order every run
+        (rng or random).shuffle(self.music_tracks)
+        self._validate_tracks()
+
+        # The next track is read into memory on a worker thread and queued on the mixer ahead of time
+        self.prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="music")
+        self.queued_index = None
 
         # --- SFX SETUP (Pre-load sounds here) ---
-        self.sfx = {}
-        self._load_sfx("pop")
+        # resources/audio/sfx/manifest.json lists the sounds and the channel groups they play on
+        self.sfx = SfxPool()
+        self.sfx_names = self.sfx.names()
+        if preload_sfx:
+            for name in self.sfx_names:
+                self._load_sfx(name)
+
+    def sfx_path(self, name):
+        return self.sfx.path(name)
+
+    def load_sound(self, path):
+        """Decodes a sound, from the asset bundle when it has it"""
+        data = self.bundle.audio(path) if self.bundle else None
+        return pygame.mixer.Sound(file=data) if data else pygame.mixer.Sound(path)
 
     def _load_sfx(self, name):
         """Helper to load a sound file into memory once"""
+        path = self.sfx_path(name)
         try:
-            path = os.path.join("resources", "audio", "sfx", f"{name}.ogg")
-            sound = pygame.mixer.Sound(path)
-            sound.set_volume(0.5)
-            self.sfx[name] = sound
-            print(f"MusicManager: Loaded SFX {name}")
+            self.add_sfx(name, self.load_sound(path))
         except Exception as e:
             print(f"MusicManager Error: Could not load SFX {path}: {e}")
 
+    def add_sfx(self, name, sound):
+        """Registers a sound decoded elsewhere, e.g. by the asset preloader"""
+        self.sfx.add(name, sound)
+        print(f"MusicManager: Loaded SFX {name}")
+
+    def track_path(self, index):
+        return os.path.join("resources", "audio", self.music_tracks[index])
+
+    def _validate_tracks(self):
+        """Drops tracks that are neither on disk nor in the bundle, so playback never fails mid-game"""
+        missing = [name for name in self.music_tracks if not self._track_exists(name)]
+        if missing:
+            print(f"MusicManager Warning: Skipping missing tracks {', '.join(missing)}")
+        self.music_tracks = [name for name in self.music_tracks if name not in missing]
+
+    def _track_exists(self, name):
+        path = os.path.join("resources", "audio", name)
+        return os.path.exists(path) or (self.bundle is not None and self.bundle.has_audio(path))
+
+    def _read_track(self, path):
+        """Runs on the prefetch thread: pulls the whole file into memory"""
+        data = self.bundle.audio(path) if self.bundle else None
+        if data is None:
+            with open(path, "rb") as f:
+                data = io.BytesIO(f.read())
+        return data
+
     def start_music(self):
+        if not self.music_tracks:
+            return
+        try:
+            pygame.mixer.music.set_endevent(MUSIC_END)
+        except pygame.error as e:
+            print(f"MusicManager Error: Could not start music: {e}")
+            return
         self._play_current_track()
+        self._prefetch_next()
+
+    def _prefetch_next(self):
+        index = (self.current_track_index + 1) % len(self.music_tracks)
+        future = self.prefetcher.submit(self._read_track, self.track_path(index))
+        # pygame.event.post is safe to call from the worker; the main thread queues it when the event arrives
+        future.add_done_callback(lambda future: pygame.event.post(
+            pygame.event.Event(MUSIC_PREFETCHED, index=index, future=future)))
+
+    def handle_event(self, event):
+        """Feed every event through here; returns True if it was a music event"""
+        if event.type == MUSIC_PREFETCHED:
+            self._queue_track(event.index, event.future)
+            return True
+        if event.type == MUSIC_END:
+            if self.queued_index is None:
+                # The prefetch didn't land in time, so nothing was queued
+                self.play_next_song()
+            else:
+                # The mixer already switched to the queued track by itself
+                self.current_track_index = self.queued_index
+                self.queued_index = None
+                print(f"MusicManager: Now playing {self.music_tracks[self.current_track_index]}")
+            self._prefetch_next()
+            return True
+        return False
 
-    def update(self):
-        if not pygame.mixer.music.get_busy():
-            self.play_next_song()
+    def _queue_track(self, index, future):
+        try:
+            pygame.mixer.music.queue(future.result(), "ogg")
+            self.queued_index = index
+        except Exception as e:
+            print(f"MusicManager Error: Could not queue {self.track_path(index)}: {e}")
 
     def play_next_song(self):
         self.current_track_index = (self.current_track_index + 1) % len(self.music_tracks)
+        self.queued_index = None
         self._play_current_track()
 
     def _play_current_track(self):
+        track_path = self.track_path(self.current_track_index)
         try:
-            track_name = self.music_tracks[self.current_track_index]
-            track_path = os.path.join("resources", "audio", track_name)
-            pygame.mixer.music.load(track_path)
+            data = self.bundle.audio(track_path) if self.bundle else None
+            if data:
+                pygame.mixer.music.load(data, "ogg")
+            else:
+                pygame.mixer.music.load(track_path)
             pygame.mixer.music.set_volume(0.4)
             pygame.mixer.music.play()
-            print(f"MusicManager: Now playing {track_name}")
+            print(f"MusicManager: Now playing {self.music_tracks[self.current_track_index]}")
         except Exception as e:
             print(f"MusicManager Error: Could not play {track_path}: {e}")
 
     def play_sfx(self, sfx_name):
-        """Plays a pre-loaded sound effect"""
-        if sfx_name in self.sfx:
-            self.sfx[sfx_name].play()
+        """Plays a pre-loaded sound effect on its channel group"""
+        if sfx_name in self.sfx.sounds:
+            self.sfx.play(sfx_name)
         else:
             print(f"MusicManager Warning: SFX '{sfx_name}' not loaded!")
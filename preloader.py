@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import pygame
+
+from asset_cache import assets
+
+
+def _decode_image(path):
+    return pygame.image.load(path)
+
+
+def _decode_sound(path):
+    return pygame.mixer.Sound(path)
+
+
+class AssetPreloader:
+    def __init__(self, max_workers=4, frame_budget=0.004):
+        # PNG/OGG decoding runs on worker threads, display-format conversion stays on the main thread
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preload")
+        self.frame_budget = frame_budget  # Seconds of conversion work allowed per pump()
+        self.pending = []
+        self.total = 0
+        self.loaded = 0
+
+    def add_image(self, path, sizes=()):
+        """Queues an image to decode, then convert and pre-scale to each of sizes"""
+        if not path:
+            return
+        future = self.executor.submit(_decode_image, path)
+        self.pending.append((future, self._finish_image, (path, sizes)))
+        self.total += 1
+
+    def add_atlas(self, atlas):
+        """Queues the atlas image; once attached, the cache serves its sprites as subsurfaces"""
+        future = self.executor.submit(_decode_image, atlas.image_path)
+        self.pending.append((future, self._finish_atlas, (atlas,)))
+        self.total += 1
+
+    def add_sound(self, path, on_loaded, decode=_decode_sound):
+        """Queues a sound to decode; on_loaded(sound) is called on the main thread"""
+        future = self.executor.submit(decode, path)
+        self.pending.append((future, self._finish_sound, (path, on_loaded)))
+        self.total += 1
+
+    def _finish_image(self, future, path, sizes):
+        try:
+            assets.store(path, future.result())
+        except Exception as e:
+            print(f"AssetPreloader Error: Could not load {path}: {e}")
+            assets.store(path, None)
+        for size in sizes:
+            assets.get(path, size)
+
+    def _finish_atlas(self, future, atlas):
+        try:
+            atlas.attach(future.result())
+            assets.use_atlas(atlas)
+        except Exception as e:
+            print(f"AssetPreloader Error: Could not load atlas {atlas.image_path}: {e}")
+
+    def _finish_sound(self, future, path, on_loaded):
+        try:
+            on_loaded(future.result())
+        except Exception as e:
+            print(f"AssetPreloader Error: Could not load {path}: {e}")
+
+    def pump(self, budget=None):
+        """Hands finished assets to the main thread, stopping once the frame budget is spent"""
+        budget = self.frame_budget if budget is None else budget
+        start = perf_counter()
+        still_pending = []
+        for i, (future, finish, args) in enumerate(self.pending):
+            if perf_counter() - start > budget:
+                still_pending.extend(self.pending[i:])
+                break
+            if future.done():
+                finish(future, *args)
+                self.loaded += 1
+            else:
+                still_pending.append((future, finish, args))
+        self.pending = still_pending
+
+    def wait(self):
+        """Blocks until everything is loaded, for tools that can't show a loading screen"""
+        for future, _, _ in self.pending:
+            future.exception()
+        self.pump(budget=float("inf"))
+        self.executor.shutdown(wait=False)
+
+    def done(self):
+        return not self.pending
+
+    def progress(self):
+        return self.loaded / self.total if self.total else 1.0
@@ -0,0 +1,174 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter_ns
+
+FRAME = "frame"
+FRAME_BUDGET_NS = 1_000_000_000 // 60  # 16.6 ms at 60 FPS
+
+
+class _Section:
+    """Reusable context manager that times one named phase"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, perf_counter_ns() - self.start)
+        return False
+
+
+class _FrameSection(_Section):
+    """Like _Section, but adds up every run in the frame into one sample taken in end_frame"""
+
+    def __exit__(self, *exc):
+        self.profiler.frame_totals[self.name] += perf_counter_ns() - self.start
+        return False
+
+
+class _NullSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, window=600):
+        # Rolling window of the last `window` samples per phase, in nanoseconds
+        self.window = window
+        self.samples = {}
+        self.sections = {}
+        self.frame_totals = {}  # Per-frame sections -> nanoseconds spent in them so far this frame
+        self.order = []
+        self.frame_start = 0
+        self.frames = 0
+        self.spikes = 0  # Frames over the 60 FPS budget
+        self.overlay_visible = False
+        self.overlay_lines = []
+        self.overlay_backdrop = None
+
+    def section(self, name):
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = _Section(self, name)
+        return section
+
+    def per_frame(self, name):
+        """
+        Section for phases that run a varying number of times per frame, like
+        simulation ticks under the fixed timestep. Their time is summed and
+        recorded as one sample per frame, 0 on frames where they didn't run,
+        so their percentiles line up with the per-frame draw phases.
+        """
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = _FrameSection(self, name)
+            self.frame_totals[name] = 0
+        return section
+
+    def add(self, name, duration_ns):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+            self.order.append(name)
+        samples.append(duration_ns)
+
+    def begin_frame(self):
+        self.frame_start = perf_counter_ns()
+
+    def end_frame(self):
+        duration = perf_counter_ns() - self.frame_start
+        totals = self.frame_totals
+        for name in totals:
+            self.add(name, totals[name])
+            totals[name] = 0
+        self.add(FRAME, duration)
+        self.frames += 1
+        if duration > FRAME_BUDGET_NS:
+            self.spikes += 1
+        # Sorting every window each frame would show up in the profile itself
+        if self.overlay_visible and self.frames % 30 == 0:
+            self.overlay_lines = self._format_lines()
+
+    def stats(self, name):
+        samples = sorted(self.samples.get(name, ()))
+        if not samples:
+            return None
+        count = len(samples)
+        return {
+            "p50_ms": samples[count // 2] / 1e6,
+            "p95_ms": samples[min(count - 1, int(count * 0.95))] / 1e6,
+            "p99_ms": samples[min(count - 1, int(count * 0.99))] / 1e6,
+            "mean_ms": sum(samples) / count / 1e6,
+            "max_ms": samples[-1] / 1e6,
+            "samples": count,
+        }
+
+    def summary(self):
+        return {name: self.stats(name) for name in self.order}
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_lines = self._format_lines() if self.overlay_visible else []
+
+    def _format_lines(self):
+        lines = [f"{'phase':<18}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<18}{stats['p50_ms']:7.2f}{stats['p95_ms']:7.2f}{stats['p99_ms']:7.2f}")
+        lines.append(f"frames over budget: {self.spikes}/{self.frames}")
+        return lines
+
+    def draw(self, screen, font, text_cache):
+        """Draws the percentile table in the top right corner and returns the rect it covered"""
+        import pygame
+
+        if not self.overlay_visible or not self.overlay_lines:
+            return None
+        line_height = font.get_linesize()
+        width = 300
+        panel = pygame.Rect(screen.get_width() - width - 10, 10, width, line_height * len(self.overlay_lines) + 10)
+        if self.overlay_backdrop is None or self.overlay_backdrop.get_size() != panel.size:
+            self.overlay_backdrop = pygame.Surface(panel.size)
+            self.overlay_backdrop.set_alpha(200)
+        screen.blit(self.overlay_backdrop, panel)
+        for i, line in enumerate(self.overlay_lines):
+            text = text_cache.render(font, line, True, (255, 255, 255))
+            screen.blit(text, (panel.x + 5, panel.y + 5 + i * line_height))
+        return panel
+
+    def export(self, path):
+        summary = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "max_ms", "samples"])
+                for name, stats in summary.items():
+                    writer.writerow([name, stats["p50_ms"], stats["p95_ms"], stats["p99_ms"],
+                                     stats["mean_ms"], stats["max_ms"], stats["samples"]])
+        else:
+            with open(path, "w") as f:
+                json.dump({"frames": self.frames, "frames_over_budget": self.spikes, "phases": summary}, f, indent=2)
+        print(f"FrameProfiler: Wrote {path}")
+
+
+class NullProfiler:
+    """Stand-in used by headless simulations so timing costs nothing"""
+
+    _section = _NullSection()
+
+    def section(self, name):
+        return self._section
+
+    def per_frame(self, name):
+        return self._section
+
+
+NULL_PROFILER = NullProfiler()
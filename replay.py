@@ -0,0 +1,114 @@
+"""
+replay.py - Input recorder and replayer for the Vietnamese Restaurant Game
+
+A replay log is the simulation seed and the level file played, followed by
+one byte per tick holding the movement direction and the number of SPACE
+presses, plus a trailer with the final score. Feeding the same seed, level
+and inputs back into RestaurantSimulation reproduces the shift tick for tick,
+so logs double as regression fixtures.
+
+Run headless:   python replay.py shift.rpl
+Run rendered:   python viet_restaurant.py --replay shift.rpl
+"""
+
+import argparse
+import struct
+import time
+
+MAGIC = b"PSR2"
+HEADER = struct.Struct("<4sqH")     # magic, seed (signed, --seed takes negatives), length of the level path after it
+TRAILER = struct.Struct("<qIII")    # score, orders completed, customers lost, ticks
+END_OF_INPUT = 0xFF                 # Never a valid tick byte, direction bits only go up to 2
+MAX_INTERACTIONS = 15
+
+
+def encode_tick(dx, dy, interactions):
+    return (dx + 1) | ((dy + 1) << 2) | (min(interactions, MAX_INTERACTIONS) << 4)
+
+
+def decode_tick(byte):
+    return (byte & 0b11) - 1, ((byte >> 2) & 0b11) - 1, byte >> 4
+
+
+class InputRecorder:
+    def __init__(self, path, seed, level):
+        self.path = path
+        self.seed = seed
+        self.level = level
+        self.ticks = bytearray()
+
+    def record(self, dx, dy, interactions):
+        self.ticks.append(encode_tick(dx, dy, interactions))
+
+    def save(self, sim):
+        with open(self.path, "wb") as f:
+            level = self.level.encode()
+            f.write(HEADER.pack(MAGIC, self.seed, len(level)))
+            f.write(level)
+            f.write(self.ticks)
+            f.write(bytes([END_OF_INPUT]))
+            f.write(TRAILER.pack(sim.score, sim.orders_completed, sim.customers_lost, len(self.ticks)))
+        print(f"Replay: Saved {len(self.ticks)} ticks to {self.path}")
+
+
+class InputReplay:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, self.seed, level_length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay log")
+        start = HEADER.size + level_length
+        self.level = data[HEADER.size:start].decode()
+
+        end = data.index(END_OF_INPUT, start)
+        self.ticks = data[start:end]
+        score, orders, lost, _ = TRAILER.unpack_from(data, end + 1)
+        self.expected = {"score": score, "orders_completed": orders, "customers_lost": lost}
+        self.position = 0
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def finished(self):
+        return self.position >= len(self.ticks)
+
+    def next_input(self):
+        """Returns (dx, dy, interactions) for the next recorded tick"""
+        byte = self.ticks[self.position]
+        self.position += 1
+        return decode_tick(byte)
+
+    def check(self, sim):
+        """Returns the outcome fields that differ from the recording, empty if it reproduced"""
+        actual = {"score": sim.score, "orders_completed": sim.orders_completed, "customers_lost": sim.customers_lost}
+        return {key: (self.expected[key], actual[key]) for key in actual if actual[key] != self.expected[key]}
+
+
+def replay_headless(path):
+    from simulation import RestaurantSimulation
+
+    replay = InputReplay(path)
+    sim = RestaurantSimulation(seed=replay.seed, level=replay.level)
+    sim.spawn_customer()
+    while not replay.finished():
+        sim.step(*replay.next_input())
+    return replay, sim
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded shift headless and check the outcome")
+    parser.add_argument("log")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    replay, sim = replay_headless(args.log)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(replay)} ticks on {replay.level} in {elapsed * 1000:.1f}ms: score={sim.score} "
+          f"orders={sim.orders_completed} lost={sim.customers_lost}")
+    mismatches = replay.check(sim)
+    if mismatches:
+        for key, (expected, actual) in mismatches.items():
+            print(f"MISMATCH {key}: recorded {expected}, replayed {actual}")
+        raise SystemExit(1)
+    print("Replay matches the recording")
@@ -0,0 +1,113 @@
+import os
+import json
+from time import perf_counter
+
+import pygame
+
+SFX_DIR = os.path.join("resources", "audio", "sfx")
+SFX_MANIFEST = os.path.join(SFX_DIR, "manifest.json")
+
+
+class SfxPool:
+    """
+    Plays sound effects on reserved mixer channels.
+
+    The manifest splits the channels into groups (ui, kitchen, customers, ...),
+    so a burst of one kind of sound can never starve the others. Each sound
+    caps how many copies of itself may overlap; once a group is full, a new
+    sound steals the quietest-priority, oldest voice, or is dropped if every
+    playing voice outranks it.
+    """
+
+    def __init__(self, manifest_path=SFX_MANIFEST):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.groups = manifest["groups"]
+        self.specs = manifest["sounds"]
+        for name, spec in self.specs.items():
+            if spec.get("group") not in self.groups:
+                raise ValueError(f"SFX '{name}' uses unknown channel group {spec.get('group')!r}")
+        self.sounds = {}
+
+        # Channel -> (sound name, priority, start time) of whatever was last started on it
+        self.channels = {}
+        self.voices = {}
+        self.plays = {group: 0 for group in self.groups}
+        self.steals = {group: 0 for group in self.groups}
+        self.drops = {group: 0 for group in self.groups}
+        self.peak = {group: 0 for group in self.groups}
+        self._reserve_channels()
+
+    def _reserve_channels(self):
+        """Puts the groups on the lowest channels and reserves them so Sound.play() never picks them"""
+        if not pygame.mixer.get_init():
+            return
+        total = sum(self.groups.values())
+        if pygame.mixer.get_num_channels() < total + 2:
+            pygame.mixer.set_num_channels(total + 2)
+        pygame.mixer.set_reserved(total)
+        start = 0
+        for group, count in self.groups.items():
+            self.channels[group] = [pygame.mixer.Channel(i) for i in range(start, start + count)]
+            start += count
+
+    def names(self):
+        return list(self.specs)
+
+    def path(self, name):
+        return os.path.join(SFX_DIR, self.specs[name]["file"])
+
+    def add(self, name, sound):
+        sound.set_volume(self.specs[name].get("volume", 1.0))
+        self.sounds[name] = sound
+
+    def play(self, name):
+        """Starts a sound, returns the channel it got or None if it was dropped"""
+        sound = self.sounds.get(name)
+        spec = self.specs.get(name)
+        if sound is None or spec is None:
+            return None
+        group = spec["group"]
+        channels = self.channels.get(group)
+        if not channels:
+            return None
+        priority = spec.get("priority", 0)
+
+        busy = [channel for channel in channels if channel.get_busy()]
+        same = [channel for channel in busy if self.voices[channel][0] == name]
+        if len(same) >= spec.get("max_polyphony", len(channels)):
+            # Too many copies already, so restart the oldest one instead of stacking another
+            channel = min(same, key=lambda channel: self.voices[channel][2])
+            self.steals[group] += 1
+        elif len(busy) < len(channels):
+            channel = next(channel for channel in channels if not channel.get_busy())
+        else:
+            victims = [channel for channel in busy if self.voices[channel][1] <= priority]
+            if not victims:
+                self.drops[group] += 1
+                return None
+            channel = min(victims, key=lambda channel: (self.voices[channel][1], self.voices[channel][2]))
+            self.steals[group] += 1
+
+        channel.play(sound)
+        self.voices[channel] = (name, priority, perf_counter())
+        self.plays[group] += 1
+        self.peak[group] = max(self.peak[group], sum(1 for channel in channels if channel.get_busy()))
+        return channel
+
+    def report(self):
+        """Per-group channel usage, for tuning group sizes and polyphony limits"""
+        rows = {}
+        for group, count in self.groups.items():
+            channels = self.channels.get(group, [])
+            rows[group] = dict(channels=count, busy=sum(1 for channel in channels if channel.get_busy()),
+                               peak=self.peak[group], plays=self.plays[group],
+                               steals=self.steals[group], drops=self.drops[group])
+        return rows
+
+    def summary(self):
+        lines = [f"{'group':<12}{'chans':>6}{'peak':>6}{'plays':>7}{'steals':>8}{'drops':>7}"]
+        for group, row in self.report().items():
+            lines.append(f"{group:<12}{row['channels']:>6}{row['peak']:>6}{row['plays']:>7}"
+                         f"{row['steals']:>8}{row['drops']:>7}")
+        return lines
@@ -0,0 +1,667 @@
+"""
+simulation.py - Pure game logic for the Vietnamese Restaurant Game
+
+RestaurantSimulation holds the whole restaurant state and advances it one
+tick at a time. It never opens a display or touches fonts, so shifts can be
+run headless for balancing and regression checks; viet_restaurant.py only
+reads this state to draw it.
+"""
+
+import os
+import math
+import random
+import argparse
+from collections import deque
+
+import pygame
+
+from profiler import NULL_PROFILER
+from level import DEFAULT_LEVEL, load_level
+from spatial_hash import SpatialHash
+from timers import TimerQueue
+from kitchen import Kitchen
+from analytics import SessionAnalytics, IDLE
+from constants import SCREEN_WIDTH, FPS, CUSTOMER_SIZE, HELD_ICON_SIZE, ORANGE
+
+# One simulation tick per frame at the game's target frame rate
+TICKS_PER_SECOND = FPS
+
+# Patience a waiting customer loses per tick
+PATIENCE_DECAY = 0.05
+MESSAGE_TICKS = 120  # 2 seconds
+
+# Timer kinds, in the order timers due on the same tick are handled
+COOK_DONE = 0
+CUSTOMER_LEAVES = 1
+CUSTOMER_SPAWN = 2
+
+
+class Player:
+    # Entities use __slots__ and keep their position only in rect, x and y just read it back
+    __slots__ = ("prev_x", "prev_y", "rect", "reach", "sprite_path", "held_ingredient",
+                 "held_ingredient_sprite_path")
+    width = 70
+    height = 90
+    speed = 5
+    color = ORANGE
+
+    def __init__(self, x, y, sprite_path=None):
+        self.prev_x = x
+        self.prev_y = y
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.reach = self.rect.inflate(20, 20)  # Stations touching this are close enough to use
+        self.sprite_path = sprite_path
+        self.held_ingredient = None
+        self.held_ingredient_sprite_path = None
+
+    def reach_rect(self):
+        """Interaction area around the player, updated in place rather than re-allocated"""
+        self.reach.update(self.rect)
+        self.reach.inflate_ip(20, 20)
+        return self.reach
+
+    def move(self, dx, dy):
+        """Moves one tick in the direction (dx, dy), each -1, 0 or 1"""
+        # Where the tick started, so the renderer can draw in between ticks
+        rect = self.rect
+        self.prev_x = rect.x
+        self.prev_y = rect.y
+        rect.x += dx * self.speed
+        rect.y += dy * self.speed
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    @property
+    def y(self):
+        return self.rect.y
+
+
+class IngredientStation:
+    __slots__ = ("rect", "ingredient_name", "color", "sprite_path")
+    width = 80
+    height = 80
+
+    def __init__(self, x, y, ingredient_name, color, sprite_path=None):
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.ingredient_name = ingredient_name
+        self.color = color
+        self.sprite_path = sprite_path
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    @property
+    def y(self):
+        return self.rect.y
+
+    def is_player_near(self, player):
+        return self.rect.colliderect(player.reach_rect())
+
+
+class CookingStation:
+    __slots__ = ("rect", "station_type", "ingredients", "ingredient_bits", "mask", "count", "cooking",
+                 "ready_tick", "cook_time", "revision", "sprite_path")
+    width = 120
+    height = 100
+
+    def __init__(self, x, y, station_type, sprite_path=None, cook_time=180, ingredient_bits=None):
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.station_type = station_type  # "prep", "cook", "serve"
+        # Contents, plus a running summary so matching never rescans them: bitmask of what's in and how many
+        self.ingredients = []
+        self.ingredient_bits = ingredient_bits or {}
+        self.mask = 0
+        self.count = 0
+        self.cooking = False
+        self.ready_tick = 0  # Tick cooking finishes on, while cooking
+        self.cook_time = cook_time  # 3 seconds at 60 FPS by default
+        self.revision = 0  # Bumped whenever the contents change so cached layers can re-bake
+        self.sprite_path = sprite_path
+
+    def add_ingredient(self, ingredient):
+        if self.count < 5:
+            self.ingredients.append(ingredient)
+            self.mask |= self.ingredient_bits.get(ingredient, 0)
+            self.count += 1
+            self.revision += 1
+            return True
+        return False
+
+    def set_ingredients(self, ingredients):
+        self.ingredients = ingredients
+        bits = self.ingredient_bits
+        self.mask = 0
+        for ingredient in ingredients:
+            self.mask |= bits.get(ingredient, 0)
+        self.count = len(ingredients)
+        self.revision += 1
+
+    def load(self, ingredients, mask, count):
+        """Takes over an ingredient list and its summary as-is"""
+        self.ingredients, self.mask, self.count = ingredients, mask, count
+        self.revision += 1
+
+    def unload(self):
+        """Hands back (ingredients, mask, count) without copying and leaves the station empty"""
+        contents = self.ingredients, self.mask, self.count
+        self.clear()
+        return contents
+
+    def start_cooking(self, tick):
+        """Starts cooking on tick and returns the tick it will be done on, or None if it can't start"""
+        if self.count and not self.cooking:
+            self.cooking = True
+            # The tick cooking starts on counts as its first tick
+            self.ready_tick = tick + self.cook_time - 1
+            return self.ready_tick
+        return None
+
+    def progress(self, tick):
+        """Fraction of the cook done as of tick"""
+        return min(1.0, (self.cook_time - (self.ready_tick - tick)) / self.cook_time)
+
+    def clear(self):
+        self.ingredients = []
+        self.mask = 0
+        self.count = 0
+        self.cooking = False
+        self.ready_tick = 0
+        self.revision += 1
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    @property
+    def y(self):
+        return self.rect.y
+
+    def is_player_near(self, player):
+        return self.rect.colliderect(player.reach_rect())
+
+
+class Customer:
+    __slots__ = ("name", "color", "order", "max_patience", "served", "leaving", "spawn_tick", "seat_tick",
+                 "leave_tick", "order_mask", "seat_index", "queued", "rect", "sprite_path")
+
+    def __init__(self, name, color, order, x, y, sprite_path=None, max_patience=200.0):
+        self.name = name
+        self.color = color
+        self.order = order  # List of required ingredients
+        self.max_patience = max_patience
+        self.served = False
+        self.leaving = False
+        self.spawn_tick = 0
+        self.seat_tick = 0  # Tick they sat down and their order became visible
+        self.leave_tick = 0  # Patience runs out on this tick
+        self.order_mask = 0  # Ingredient bitmask of the order, filled in when the restaurant seats them
+        self.seat_index = None  # Level seat they hold, None when placed by hand
+        self.queued = False  # Still in the line, waiting for a seat
+        self.rect = pygame.Rect((x, y), CUSTOMER_SIZE)
+        self.sprite_path = sprite_path
+
+    def arrive(self, tick):
+        """Starts the patience clock; returns the tick the customer gives up on"""
+        self.spawn_tick = tick
+        # Tolerance so e.g. 50 / 0.05 lands on 1000 rather than 1001
+        self.leave_tick = tick + math.ceil(self.max_patience / PATIENCE_DECAY - 1e-9)
+        return self.leave_tick
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    @property
+    def y(self):
+        return self.rect.y
+
+    def patience_at(self, tick):
+        """Patience left at tick, worked out from the deadline instead of counted down"""
+        return max(0.0, (self.leave_tick - tick) * PATIENCE_DECAY)
+
+
+class RestaurantSimulation:
+    # Entity classes, overridden by the renderer to attach sprites and draw methods
+    player_class = Player
+    ingredient_station_class = IngredientStation
+    cooking_station_class = CookingStation
+    customer_class = Customer
+
+    def __init__(self, seed=None, cook_time=180, max_patience=200.0, customer_spawn_delay=None, level=DEFAULT_LEVEL):
+        # Layout, menu and customer pool come from a level file, see level.py
+        self.level = level = load_level(level)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.score = 0
+        self.orders_completed = 0
+        self.customers_lost = 0
+        self.total_wait_ticks = 0  # Summed over served customers, for the mean wait
+        self.max_patience = max_patience
+
+        # Events raised during the current tick for the front end (sound effects etc.)
+        self.events = []
+
+        # Per-phase timing, swapped for a FrameProfiler by the game
+        self.profiler = NULL_PROFILER
+
+        # Customer lifecycle and station state changes, folded into throughput numbers, see analytics.py
+        self.analytics = SessionAnalytics(TICKS_PER_SECOND)
+
+        # Player
+        x, y, sprite = level.player
+        self.player = self.player_class(x, y, sprite)
+
+        # Sprite mapping for ingredients
+        self.sprite_map = level.sprite_map
+
+        # Ingredient stations
+        station = self.ingredient_station_class
+        self.ingredient_stations = [station(x, y, name, color, sprite)
+                                    for name, x, y, color, sprite in level.ingredients]
+
+        # Cooking stations
+        def cooking_station(station_type, position, **params):
+            x, y, sprite = position
+            return self.cooking_station_class(x, y, station_type, sprite,
+                                              ingredient_bits=level.ingredient_bits, **params)
+
+        self.prep_station = cooking_station("prep", level.stations["prep"])
+        # One cook station per burner; cook_station is the first, for code that only cares about one
+        self.cook_stations = [cooking_station("cook", burner, cook_time=cook_time)
+                              for burner in level.stations["cook"]]
+        self.cook_station = self.cook_stations[0]
+        self.serve_station = cooking_station("serve", level.stations["serve"])
+        self.analytics.station("prep", IDLE, 0)
+
+        # Everything the player can walk up to, filed in a grid so proximity checks don't scan every station.
+        # Cooking stations go in first so they keep their hint draw order
+        self.floor = SpatialHash()
+        for station in (self.prep_station, *self.cook_stations, self.serve_station, *self.ingredient_stations):
+            self.floor.insert(station, station.rect)
+
+        # Seated customers, plus the same customers indexed by the ingredient mask of their order
+        self.customers = []
+        self.waiting = {}
+        # Free seats as a stack of seat indices, lowest on top so seats fill front to back
+        self.free_seats = list(range(len(level.seats) - 1, -1, -1))
+        # Arrivals that found every seat taken, first come first seated
+        self.line = deque()
+        if customer_spawn_delay is None:
+            customer_spawn_delay = level.spawn_delay
+        self.customer_spawn_delay = customer_spawn_delay  # 10 seconds at 60 FPS by default
+
+        # Cooking, leaving and spawning are deadlines popped when due rather than per-tick countdowns
+        self.timers = TimerQueue()
+        self.timers.schedule(customer_spawn_delay, CUSTOMER_SPAWN)
+
+        # Prep batches queue for free burners, cooked plates wait on the pass, see kitchen.py
+        self.kitchen = Kitchen(self.cook_stations, self.serve_station, self.timers, COOK_DONE, self.analytics,
+                               pass_capacity=level.pass_capacity)
+
+        # Dishes
+        self.dishes = level.dishes
+
+        # UI message, shown until message_until
+        self.message = ""
+        self.message_until = 0
+
+    def sprite_manifest(self):
+        """Returns (path, size) for every sprite variant the entities of this restaurant draw"""
+        manifest = [(self.player.sprite_path, (self.player.width, self.player.height))]
+        for station in self.ingredient_stations:
+            # Held ingredient icons are pre-scaled too so pickups never scale mid-game
+            manifest.append((station.sprite_path, (station.width, station.height)))
+            manifest.append((station.sprite_path, HELD_ICON_SIZE))
+        for station in (self.prep_station, *self.cook_stations, self.serve_station):
+            manifest.append((station.sprite_path, (station.width, station.height)))
+        for path in self.level.customer_sprites:
+            manifest.append((path, CUSTOMER_SIZE))
+        return [(path, size) for path, size in manifest if path]
+
+    def spawn_customer(self):
+        # FIXED: Enforce the seat limit; with a line, extra customers queue for a seat instead
+        level = self.level
+        if not self.free_seats and len(self.line) >= level.line_capacity:
+            self.analytics.customer_turned_away()
+            return
+
+        name = self.rng.choice(level.customer_names)
+        color = self.rng.choice(level.customer_colors)
+        sprite = self.rng.choice(level.customer_sprites)
+        dish_name = self.rng.choice(level.dish_names)
+        order = self.dishes[dish_name]
+
+        # Customers in line stand off-screen until a seat frees up
+        x, y = level.seats[self.free_seats[-1]] if self.free_seats else (SCREEN_WIDTH, 0)
+        customer = self.customer_class(name, color, order, x, y, sprite, max_patience=self.max_patience)
+        self.timers.schedule(customer.arrive(self.tick), CUSTOMER_LEAVES, customer)
+        self.analytics.customer_spawned()
+        if self.free_seats:
+            self.seat_customer(customer, self.free_seats.pop())
+        else:
+            customer.queued = True
+            self.line.append(customer)
+
+    def seat_customer(self, customer, seat_index):
+        customer.seat_index = seat_index
+        customer.queued = False
+        customer.rect.topleft = self.level.seats[seat_index]
+        self._seat(customer)
+
+    def add_customer(self, customer):
+        """Seats a customer where they stand, outside the seat allocator (benchmarks, scripted scenes)"""
+        self.timers.schedule(customer.arrive(self.tick), CUSTOMER_LEAVES, customer)
+        self.analytics.customer_spawned()
+        self._seat(customer)
+
+    def _seat(self, customer):
+        customer.seat_tick = self.tick
+        customer.order_mask = self.level.mask(customer.order)
+        self.customers.append(customer)
+        self.waiting.setdefault(customer.order_mask, []).append(customer)
+        self.floor.insert(customer, customer.rect)
+        self.analytics.order_visible(customer, self.tick)
+
+    def remove_customer(self, customer):
+        self.customers.remove(customer)
+        waiting = self.waiting[customer.order_mask]
+        waiting.remove(customer)
+        if not waiting:
+            del self.waiting[customer.order_mask]
+        self.floor.remove(customer)
+        if customer.seat_index is not None:
+            self.free_seats.append(customer.seat_index)
+            customer.seat_index = None
+            self.drain_line()
+
+    def drain_line(self):
+        """Moves the front of the line into free seats"""
+        while self.free_seats and self.line:
+            self.seat_customer(self.line.popleft(), self.free_seats.pop())
+
+    def near_player(self):
+        """Stations and customers within reach of the player, cooking stations first"""
+        return self.floor.query(self.player.reach_rect())
+
+    def customer_for(self, plate):
+        """The longest-waiting customer who ordered exactly what's on a station or plate, or None"""
+        waiting = self.waiting.get(plate.mask)
+        return waiting[0] if waiting else None
+
+    def show_message(self, text):
+        self.message = text
+        self.message_until = self.tick + MESSAGE_TICKS
+
+    def message_visible(self):
+        return self.tick < self.message_until
+
+    def handle_interaction(self):
+        near = self.near_player()
+
+        # Pick up ingredient
+        for station in near:
+            if isinstance(station, IngredientStation) and not self.player.held_ingredient:
+                self.player.held_ingredient = station.ingredient_name
+                self.player.held_ingredient_sprite_path = station.sprite_path
+                self.events.append(("pickup", station.ingredient_name))
+                self.show_message(f"Picked up {station.ingredient_name}!")
+                return
+
+        # Interact with prep station
+        if self.prep_station in near:
+            if self.player.held_ingredient:
+                self.prep_station.add_ingredient(self.player.held_ingredient)
+                self.analytics.station("prep", "prepping", self.tick)
+                self.show_message(f"Added {self.player.held_ingredient} to prep!")
+                self.player.held_ingredient = None
+                self.player.held_ingredient_sprite_path = None
+            elif self.prep_station.count:
+                # Send the batch to the kitchen; it goes on the first free burner
+                submitted = self.kitchen.submit(self.prep_station, self.tick)
+                self.analytics.station("prep", IDLE, self.tick)
+                if submitted:
+                    self.show_message("Started cooking!")
+                else:
+                    self.show_message(f"Queued for a burner ({len(self.kitchen.jobs)} waiting)")
+            return
+
+        # Interact with a cook station
+        # near also holds ingredient stations and customers, which have no station_type
+        for station in near:
+            if isinstance(station, CookingStation) and station.station_type == "cook":
+                if station.cooking:
+                    self.show_message("Still cooking...")
+                elif station.count:
+                    self.show_message("Pass is full, serve something!")
+                else:
+                    self.show_message("Station is empty!")
+                return
+
+        # Interact with serve station
+        if self.serve_station in near:
+            if self.kitchen.ready:
+                # Serve the first plate on the pass that somebody ordered, to whoever has waited longest
+                for plate in self.kitchen.ready:
+                    customer = self.customer_for(plate)
+                    if customer:
+                        break
+                if customer:
+                    # Correct order!
+                    patience_bonus = int(customer.patience_at(self.tick))
+                    self.score += 100 + patience_bonus
+                    self.orders_completed += 1
+                    self.total_wait_ticks += self.tick - customer.spawn_tick
+                    customer.served = True
+                    self.analytics.customer_served(customer, self.tick)
+                    self.remove_customer(customer)
+                    self.kitchen.take(plate, self.tick)
+                    self.events.append(("served", customer))
+                    self.show_message(f"Perfect! +{100 + patience_bonus} points!")
+                else:
+                    self.show_message("No matching customer order!")
+            else:
+                self.show_message("Serve station is empty!")
+            return
+
+    def step(self, dx=0, dy=0, interactions=0):
+        """Advances the restaurant by one tick given this tick's input"""
+        profiler = self.profiler
+        self.events = []
+        self.tick += 1
+
+        with profiler.per_frame("sim.player"):
+            # SPACE presses are handled before movement, like the event pump did
+            for _ in range(interactions):
+                self.handle_interaction()
+
+            # Update player movement
+            self.player.move(dx, dy)
+
+        with profiler.per_frame("sim.timers"):
+            for _, kind, subject in self.timers.pop_due(self.tick):
+                if kind == COOK_DONE:
+                    self.finish_cooking(subject)
+                elif kind == CUSTOMER_LEAVES:
+                    self.customer_leaves(subject)
+                elif kind == CUSTOMER_SPAWN:
+                    self.spawn_customer()
+                    self.timers.schedule(self.tick + self.customer_spawn_delay, CUSTOMER_SPAWN)
+
+    def finish_cooking(self, station):
+        # Cooking done, move to the pass if there's room
+        plate = self.kitchen.finish(station, self.tick)
+        if plate:
+            dish = self.level.recipes.get(plate.mask)
+            self.show_message(f"{dish} ready to serve!" if dish else "Dish ready to serve!")
+
+    def kitchen_report(self):
+        """Kitchen bottleneck numbers: burner utilization, queue waits and throughput"""
+        report = self.kitchen.report(self.tick)
+        minutes = self.tick / TICKS_PER_SECOND / 60
+        report["orders_per_minute"] = self.orders_completed / minutes if minutes else 0.0
+        return report
+
+    def write_summary(self, path):
+        """Writes the session's throughput summary, see analytics.py"""
+        self.analytics.write(path, self.tick, seed=self.seed, level=self.level.name, ticks=self.tick,
+                             score=self.score)
+
+    def customer_leaves(self, customer):
+        # Served customers are already gone, their leave timer just runs out harmlessly
+        if customer.served or customer.leaving:
+            return
+        customer.leaving = True
+        self.analytics.customer_left(customer, self.tick)
+        if customer.queued:
+            # Gave up before getting a seat; the line is short, so removing from it is cheap
+            self.line.remove(customer)
+        else:
+            self.remove_customer(customer)
+        self.customers_lost += 1
+        self.events.append(("left", customer))
+        self.show_message("Customer left! :(")
+
+
+class AutoChef:
+    """Scripted player that works orders front to back, used to drive headless shifts"""
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def next_input(self):
+        """Returns (dx, dy, interactions) for the next tick"""
+        sim = self.sim
+        player = sim.player
+        waiting = [c for c in sim.customers if not c.leaving and not c.served]
+
+        # Serve anything on the pass that somebody is waiting for
+        if any(sim.customer_for(plate) for plate in sim.kitchen.ready):
+            return self._walk_and_use(sim.serve_station)
+
+        if player.held_ingredient:
+            return self._walk_and_use(sim.prep_station)
+
+        # Work on the longest-waiting order that isn't already being made, preferring one prep has started
+        in_flight = sim.kitchen.in_flight()
+        open_orders = []
+        for customer in waiting:
+            if customer.order_mask in in_flight:
+                in_flight.remove(customer.order_mask)
+            else:
+                open_orders.append(customer)
+        prep_mask = sim.prep_station.mask
+        started = [c.order for c in open_orders if c.order_mask & prep_mask == prep_mask]
+        if prep_mask and not started:
+            # Whoever prep was started for is gone, so finish it as any dish it fits rather than spoil it
+            started = [sim.dishes[dish] for dish, mask in sim.level.dish_masks.items()
+                       if mask & prep_mask == prep_mask]
+        if not (started or open_orders):
+            return 0, 0, 0
+        target = (started or [c.order for c in open_orders])[0]
+
+        bits = sim.level.ingredient_bits
+        missing = [ing for ing in target if not prep_mask & bits[ing]]
+        if missing:
+            for station in sim.ingredient_stations:
+                if station.ingredient_name == missing[0]:
+                    return self._walk_and_use(station)
+        # Prep is complete, send it to the kitchen
+        return self._walk_and_use(sim.prep_station)
+
+    def _walk_and_use(self, station):
+        player = self.sim.player
+        dx = _sign(station.rect.centerx - player.rect.centerx)
+        dy = _sign(station.rect.centery - player.rect.centery)
+        if (abs(station.rect.centerx - player.rect.centerx) < player.speed
+                and abs(station.rect.centery - player.rect.centery) < player.speed):
+            return 0, 0, 1
+        return dx, dy, 0
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def check_interactions(level=DEFAULT_LEVEL):
+    """
+    Presses SPACE on top of every station and seated customer, empty-handed
+    and holding an ingredient, each in a fresh restaurant. Returns a list of
+    "what: error" strings for every press that raised, empty if none did.
+    """
+    failures = []
+    probe = RestaurantSimulation(seed=1, level=level)
+    probe.spawn_customer()
+    targets = [("prep", lambda sim: sim.prep_station), ("serve", lambda sim: sim.serve_station)]
+    targets += [(f"burner {i}", lambda sim, i=i: sim.cook_stations[i]) for i in range(len(probe.cook_stations))]
+    targets += [(station.ingredient_name, lambda sim, i=i: sim.ingredient_stations[i])
+                for i, station in enumerate(probe.ingredient_stations)]
+    targets.append(("customer", lambda sim: sim.customers[0]))
+
+    for name, target in targets:
+        for held in (None, probe.ingredient_stations[0].ingredient_name):
+            sim = RestaurantSimulation(seed=1, level=level)
+            sim.spawn_customer()
+            sim.player.rect.center = target(sim).rect.center
+            sim.player.held_ingredient = held
+            try:
+                sim.step(0, 0, 1)
+            except Exception as e:
+                failures.append(f"SPACE at {name}{' holding ' + held if held else ''}: {e!r}")
+    return failures
+
+
+def run_shift(ticks, seed=None, **params):
+    """Plays one shift headless with AutoChef and returns the finished simulation"""
+    sim = RestaurantSimulation(seed=seed, **params)
+    chef = AutoChef(sim)
+    sim.spawn_customer()
+    for _ in range(ticks):
+        sim.step(*chef.next_input())
+    return sim
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run restaurant shifts headless")
+    parser.add_argument("--ticks", type=int, default=3 * 60 * TICKS_PER_SECOND, help="ticks per shift")
+    parser.add_argument("--shifts", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="level file to play")
+    parser.add_argument("--kitchen", action="store_true", help="print burner utilization and queue waits")
+    parser.add_argument("--analytics", action="store_true", help="print throughput, waits and station idle time")
+    parser.add_argument("--summary", metavar="PATH",
+                        help="write each shift's session summary as JSON (PATH.<shift>.json for several shifts)")
+    parser.add_argument("--check", action="store_true",
+                        help="press SPACE next to every kind of object and report any that crash, then exit")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check_interactions(args.level)
+        for failure in failures:
+            print(f"FAILED {failure}")
+        if failures:
+            raise SystemExit(1)
+        print("Every interaction handled")
+        raise SystemExit(0)
+
+    for shift in range(args.shifts):
+        sim = run_shift(args.ticks, seed=args.seed + shift, level=args.level)
+        print(f"Shift {shift}: score={sim.score} orders={sim.orders_completed} lost={sim.customers_lost}")
+        if args.kitchen:
+            report = sim.kitchen_report()
+            for burner in report["burners"]:
+                print(f"  burner {burner['burner']}: {burner['jobs']} jobs, {burner['utilization']:.0%} cooking, "
+                      f"{burner['blocked']:.0%} blocked")
+            print(f"  queue wait mean {report['mean_queue_wait'] / TICKS_PER_SECOND:.1f}s "
+                  f"max {report['max_queue_wait'] / TICKS_PER_SECOND:.1f}s, "
+                  f"pass wait mean {report['mean_pass_wait'] / TICKS_PER_SECOND:.1f}s, "
+                  f"{report['orders_per_minute']:.2f} orders/min")
+        if args.analytics:
+            for line in sim.analytics.format_lines(sim.tick):
+                print(f"  {line}")
+        if args.summary:
+            root, ext = os.path.splitext(args.summary)
+            sim.write_summary(f"{root}.{shift}{ext}" if args.shifts > 1 else args.summary)
@@ -0,0 +1,59 @@
+class SpatialHash:
+    """
+    Uniform grid over the restaurant floor for "what is near this rect" queries.
+
+    Every object is filed under each cell its rect overlaps, so a query only
+    looks at the few cells the query rect touches instead of every station and
+    customer. Results come back in insertion order, so callers that care about
+    which of two overlapping stations wins get the same answer every time.
+    """
+
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self.cells = {}
+        # obj -> (rect, insertion order, cells it is filed under)
+        self.entries = {}
+        self._next_order = 0
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(rect.left // size, (rect.right - 1) // size + 1)
+                for cy in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def insert(self, obj, rect):
+        """Files obj under rect; the rect is kept by reference, so insert it again after moving it"""
+        if obj in self.entries:
+            self.remove(obj)
+        cells = self._cells_for(rect)
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(obj)
+        self.entries[obj] = (rect, self._next_order, cells)
+        self._next_order += 1
+
+    def remove(self, obj):
+        entry = self.entries.pop(obj, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            bucket = self.cells[cell]
+            bucket.remove(obj)
+            if not bucket:
+                del self.cells[cell]
+
+    def query(self, rect):
+        """Returns every object whose rect collides with rect, in insertion order"""
+        entries = self.entries
+        found = {}
+        for cell in self._cells_for(rect):
+            for obj in self.cells.get(cell, ()):
+                if obj not in found:
+                    obj_rect, order, _ = entries[obj]
+                    if obj_rect.colliderect(rect):
+                        found[obj] = order
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=found.__getitem__)
+
+    def __len__(self):
+        return len(self.entries)
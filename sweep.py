@@ -0,0 +1,159 @@
+"""
+sweep.py - Parameter sweeps over headless restaurant shifts
+
+Fans RestaurantSimulation shifts played by AutoChef out across a process
+pool and streams the metrics of each run into a results directory holding one
+.npy file per column. Rows land in the order runs finish, and the run column
+says which is which. Every run gets its seed from its index, so results don't
+depend on which worker ran it.
+
+Example:
+    python sweep.py --cook-time 108 180 --max-patience 100 200 --spawn-delay 300 600 --repeats 20
+
+Read the results back with numpy, even while the sweep is still running:
+    score = np.load("sweep_results/score.npy", mmap_mode="r")
+"""
+
+import argparse
+import itertools
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from simulation import run_shift, TICKS_PER_SECOND
+
+# Column -> (struct format, .npy dtype); everything little-endian
+INT, FLOAT = ("<q", "<i8"), ("<d", "<f8")
+COLUMNS = {
+    "run": INT,
+    "seed": INT,
+    "cook_time": INT,  # Ticks
+    "max_patience": FLOAT,
+    "customer_spawn_delay": INT,  # Ticks
+    "score": INT,
+    "orders_completed": INT,
+    "customers_lost": INT,
+    "mean_wait_s": FLOAT,  # Seconds
+}
+NPY_HEADER_SIZE = 128  # Fixed, so the header can be rewritten in place as the row count grows
+
+
+def build_jobs(cook_times, patiences, spawn_delays, repeats, ticks, base_seed):
+    """Returns one job per (setting combination, repeat), each with its own fixed seed"""
+    jobs = []
+    combos = itertools.product(cook_times, patiences, spawn_delays, range(repeats))
+    for run, (cook_time, max_patience, spawn_delay, _) in enumerate(combos):
+        jobs.append({
+            "run": run,
+            "seed": base_seed + run,
+            "ticks": ticks,
+            "cook_time": cook_time,
+            "max_patience": max_patience,
+            "customer_spawn_delay": spawn_delay,
+        })
+    return jobs
+
+
+def run_job(job):
+    sim = run_shift(job["ticks"], seed=job["seed"], cook_time=job["cook_time"],
+                    max_patience=job["max_patience"], customer_spawn_delay=job["customer_spawn_delay"])
+    mean_wait = sim.total_wait_ticks / sim.orders_completed if sim.orders_completed else 0.0
+    return {
+        "run": job["run"],
+        "seed": job["seed"],
+        "cook_time": job["cook_time"],
+        "max_patience": job["max_patience"],
+        "customer_spawn_delay": job["customer_spawn_delay"],
+        "score": sim.score,
+        "orders_completed": sim.orders_completed,
+        "customers_lost": sim.customers_lost,
+        "mean_wait_s": round(mean_wait / TICKS_PER_SECOND, 3),
+    }
+
+
+def npy_header(dtype, rows):
+    """A version 1.0 .npy header for a 1-D array, padded to NPY_HEADER_SIZE bytes"""
+    header = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': ({rows},), }}"
+    prefix = b"\x93NUMPY\x01\x00" + struct.pack("<H", NPY_HEADER_SIZE - 10)
+    return prefix + header.ljust(NPY_HEADER_SIZE - 11).encode("latin1") + b"\n"
+
+
+class ColumnWriter:
+    """
+    Streams rows into a directory with one .npy file per column.
+
+    Each row appends one value to every column file. After each row, every
+    header is rewritten with the new length. Nothing is buffered in memory,
+    and the directory is a loadable set of arrays at any point in the sweep.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.rows = 0
+        self.files = {}
+        for name, (_, dtype) in COLUMNS.items():
+            f = self.files[name] = open(os.path.join(directory, f"{name}.npy"), "wb")
+            f.write(npy_header(dtype, 0))
+
+    def write(self, row):
+        self.rows += 1
+        for name, (fmt, dtype) in COLUMNS.items():
+            f = self.files[name]
+            f.write(struct.pack(fmt, row[name]))
+            end = f.tell()
+            f.seek(0)
+            f.write(npy_header(dtype, self.rows))
+            f.seek(end)
+            f.flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+def run_chunk(jobs):
+    return [run_job(job) for job in jobs]
+
+
+def run_sweep(jobs, output, workers=None):
+    writer = ColumnWriter(output)
+    workers = workers or os.cpu_count()
+    # Hand jobs out in chunks so IPC overhead stays small next to the shifts themselves
+    chunksize = max(1, len(jobs) // (workers * 8))
+    chunks = (jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Only a couple of chunks per worker are in flight, and rows are written as soon as their
+            # chunk is done, so a slow chunk never holds finished results back in this process
+            pending = set()
+            for chunk in itertools.islice(chunks, workers * 2):
+                pending.add(executor.submit(run_chunk, chunk))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for row in future.result():
+                        writer.write(row)
+                    chunk = next(chunks, None)
+                    if chunk:
+                        pending.add(executor.submit(run_chunk, chunk))
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep game constants over headless shifts")
+    parser.add_argument("--cook-time", type=int, nargs="+", default=[108, 180])
+    parser.add_argument("--max-patience", type=float, nargs="+", default=[100.0, 200.0])
+    parser.add_argument("--spawn-delay", type=int, nargs="+", default=[300, 600])
+    parser.add_argument("--repeats", type=int, default=10, help="seeded shifts per setting combination")
+    parser.add_argument("--ticks", type=int, default=3 * 60 * TICKS_PER_SECOND, help="ticks per shift")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cores")
+    parser.add_argument("--output", default="sweep_results", help="directory for the per-column .npy files")
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.cook_time, args.max_patience, args.spawn_delay, args.repeats, args.ticks, args.seed)
+    start = time.perf_counter()
+    run_sweep(jobs, args.output, args.workers)
+    print(f"Ran {len(jobs)} shifts in {time.perf_counter() - start:.2f}s -> {args.output}")
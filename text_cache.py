@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, max_entries=512):
+        # Rendered surfaces keyed by (font, text, color, antialias), oldest first
+        self.surfaces = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        """Drop-in replacement for font.render that reuses previously rendered surfaces"""
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            # Evict the least recently used entry
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.surfaces.clear()
+        self.reset_stats()
+
+
+# Shared cache used by every draw call
+text_cache = TextCache()
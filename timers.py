@@ -0,0 +1,32 @@
+import heapq
+import itertools
+
+
+class TimerQueue:
+    """
+    Min-heap of deadlines in simulation ticks.
+
+    Components schedule (tick, kind, subject) once instead of counting down
+    every tick, and the simulation pops only what is due, so a tick costs
+    O(due timers) no matter how many stations or customers are waiting.
+    Timers due on the same tick come out by kind, then in scheduling order.
+    Entries are never removed early; subjects that no longer care (a served
+    customer's leave timer) are skipped by the handler.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self._order = itertools.count()
+
+    def schedule(self, tick, kind, subject=None):
+        heapq.heappush(self.heap, (tick, kind, next(self._order), subject))
+
+    def pop_due(self, tick):
+        """Yields (tick, kind, subject) for every timer due at or before tick"""
+        heap = self.heap
+        while heap and heap[0][0] <= tick:
+            due_tick, kind, _, subject = heapq.heappop(heap)
+            yield due_tick, kind, subject
+
+    def __len__(self):
+        return len(self.heap)
@@ -1,119 +1,103 @@
 import pygame
 import sys
-import random
+import argparse
 import math
+import random
+from time import perf_counter
+import simulation
+from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, FPS, CUSTOMER_SIZE, HELD_ICON_SIZE, START_SCREEN_BG,
+                       RESTAURANT_BG, WHITE, BLACK, LIGHT_BROWN, RED, GREEN, YELLOW, LIGHT_BLUE,
+                       DARK_GREEN, CREAM, GRAY)
+from simulation import RestaurantSimulation, TICKS_PER_SECOND
 from music_manager import MusicManager
+from preloader import AssetPreloader
+from atlas import load_atlas
+from level import DEFAULT_LEVEL
+from asset_bundle import load_bundle
+from profiler import FrameProfiler, FRAME
+from replay import InputRecorder, InputReplay, MAX_INTERACTIONS
+from asset_cache import assets
+from text_cache import text_cache
+from layered_renderer import LayeredRenderer
+from dirty_rects import DirtyRectTracker
 
 # Initialize Pygame
 pygame.init()
 
-# Constants
-SCREEN_WIDTH = 1200
-SCREEN_HEIGHT = 800
-FPS = 60
-
-# Colors
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BROWN = (139, 90, 43)
-LIGHT_BROWN = (205, 133, 63)
-RED = (220, 20, 60)
-GREEN = (34, 139, 34)
-YELLOW = (255, 215, 0)
-LIGHT_BLUE = (173, 216, 230)
-DARK_GREEN = (0, 100, 0)
-CREAM = (255, 253, 208)
-GRAY = (128, 128, 128)
-ORANGE = (255, 165, 0)
-
 # Game states
 MENU = "menu"
 GAME = "game"
 
-class Player:
+# The simulation always advances in fixed ticks; rendering runs at whatever rate the machine manages
+TICK_SECONDS = 1 / TICKS_PER_SECOND
+# Ticks a slow frame may catch up on; beyond that the game slows down rather than spiralling
+MAX_TICKS_PER_FRAME = 5
+
+class Player(simulation.Player):
+    __slots__ = ("draw_rect",)
+
     def __init__(self, x, y, sprite_path=None):
-        self.x = x
-        self.y = y
-        self.width = 70
-        self.height = 90
-        self.speed = 5
-        self.color = ORANGE
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        self.held_ingredient = None
-        self.held_ingredient_sprite = None
-        self.sprite = None
-        if sprite_path:
-            try:
-                self.sprite = pygame.image.load(sprite_path)
-                self.sprite = pygame.transform.scale(self.sprite, (self.width, self.height))
-            except:
-                self.sprite = None
-        
-    def move(self, keys):
-        old_x, old_y = self.x, self.y
-        
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.x -= self.speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.x += self.speed
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.y -= self.speed
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.y += self.speed
-            
-        # Update rect
-        self.rect.x = self.x
-        self.rect.y = self.y
-        
-                
+        super().__init__(x, y, sprite_path)
+        # Where the player is drawn, between the last two ticks' positions
+        self.draw_rect = self.rect.copy()
+
+    def interpolate(self, alpha):
+        """Places draw_rect alpha of the way from the previous tick's position to the current one"""
+        self.draw_rect.x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+        self.draw_rect.y = round(self.prev_y + (self.y - self.prev_y) * alpha)
+
+    @property
+    def sprite(self):
+        return assets.get(self.sprite_path, (self.width, self.height))
+
     def draw(self, screen, font):
+        rect = self.draw_rect
         if self.sprite:
             # Draw sprite
-            screen.blit(self.sprite, (self.rect.x, self.rect.y))
+            screen.blit(self.sprite, (rect.x, rect.y))
         else:
             # Fallback to simple shapes
             # Body
-            pygame.draw.rect(screen, self.color, self.rect, border_radius=5)
+            pygame.draw.rect(screen, self.color, rect, border_radius=5)
             # Head
-            pygame.draw.circle(screen, self.color, (self.rect.centerx, self.rect.y - 10), 15)
+            pygame.draw.circle(screen, self.color, (rect.centerx, rect.y - 10), 15)
             # Eyes
-            pygame.draw.circle(screen, BLACK, (self.rect.centerx - 5, self.rect.y - 10), 3)
-            pygame.draw.circle(screen, BLACK, (self.rect.centerx + 5, self.rect.y - 10), 3)
+            pygame.draw.circle(screen, BLACK, (rect.centerx - 5, rect.y - 10), 3)
+            pygame.draw.circle(screen, BLACK, (rect.centerx + 5, rect.y - 10), 3)
 
         # Show held ingredient
         if self.held_ingredient:
-            if self.held_ingredient_sprite:
+            held_ingredient_sprite = assets.get(self.held_ingredient_sprite_path, HELD_ICON_SIZE)
+            if held_ingredient_sprite:
                 # Draw downscaled ingredient sprite
                 sprite_size = 30
-                sprite_x = self.rect.centerx - sprite_size // 2
-                sprite_y = self.rect.y - 40
-                screen.blit(self.held_ingredient_sprite, (sprite_x, sprite_y))
+                sprite_x = rect.centerx - sprite_size // 2
+                sprite_y = rect.y - 40
+                screen.blit(held_ingredient_sprite, (sprite_x, sprite_y))
                 # Add a small border/background
                 pygame.draw.rect(screen, WHITE, (sprite_x - 2, sprite_y - 2, sprite_size + 4, sprite_size + 4), 2)
             else:
                 # Fallback to text display
-                text = font.render(self.held_ingredient[:4], True, WHITE)
-                pygame.draw.circle(screen, GREEN, (self.rect.centerx, self.rect.y - 35), 15)
-                text_rect = text.get_rect(center=(self.rect.centerx, self.rect.y - 35))
+                text = text_cache.render(font, self.held_ingredient[:4], True, WHITE)
+                pygame.draw.circle(screen, GREEN, (rect.centerx, rect.y - 35), 15)
+                text_rect = text.get_rect(center=(rect.centerx, rect.y - 35))
                 screen.blit(text, text_rect)
 
-class IngredientStation:
+    def bounds(self):
+        # Sprite plus the head / held ingredient drawn above it
+        rect = self.draw_rect
+        return pygame.Rect(rect.x, rect.y - 50, self.width, self.height + 50)
+
+class IngredientStation(simulation.IngredientStation):
+    __slots__ = ()
+
     def __init__(self, x, y, ingredient_name, color, sprite_path=None):
-        self.x = x
-        self.y = y
-        self.width = 80
-        self.height = 80
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        self.ingredient_name = ingredient_name
-        self.color = color
-        self.sprite = None
-        if sprite_path:
-            try:
-                self.sprite = pygame.image.load(sprite_path)
-                self.sprite = pygame.transform.scale(self.sprite, (self.width, self.height))
-            except:
-                self.sprite = None
-        
+        super().__init__(x, y, ingredient_name, color, sprite_path)
+
+    @property
+    def sprite(self):
+        return assets.get(self.sprite_path, (self.width, self.height))
+
     def draw(self, screen, font):
         if self.sprite:
             # Draw sprite
@@ -124,58 +108,25 @@ class IngredientStation:
             # Fallback to colored rectangles
             pygame.draw.rect(screen, self.color, self.rect, border_radius=10)
             pygame.draw.rect(screen, BLACK, self.rect, 3, border_radius=10)
-            text = font.render(self.ingredient_name[:6], True, WHITE)
+            text = text_cache.render(font, self.ingredient_name[:6], True, WHITE)
             text_rect = text.get_rect(center=self.rect.center)
             screen.blit(text, text_rect)
-        
-    def is_player_near(self, player):
-        return self.rect.colliderect(player.rect.inflate(20, 20))
-
-class CookingStation:
-    def __init__(self, x, y, station_type, sprite_path=None):
-        self.x = x
-        self.y = y
-        self.width = 120
-        self.height = 100
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        self.station_type = station_type  # "prep", "cook", "serve"
-        self.ingredients = []
-        self.cooking = False
-        self.cook_timer = 0
-        self.cook_time = 180  # 3 seconds at 60 FPS
-        self.sprite = None
-        if sprite_path:
-            try:
-                self.sprite = pygame.image.load(sprite_path)
-                self.sprite = pygame.transform.scale(self.sprite, (self.width, self.height))
-            except:
-                self.sprite = None
-        
-    def add_ingredient(self, ingredient):
-        if len(self.ingredients) < 5:
-            self.ingredients.append(ingredient)
-            return True
-        return False
-        
-    def start_cooking(self):
-        if self.ingredients and not self.cooking:
-            self.cooking = True
-            self.cook_timer = 0
-            
-    def update(self):
-        if self.cooking:
-            self.cook_timer += 1
-            if self.cook_timer >= self.cook_time:
-                self.cooking = False
-                return True  # Cooking complete
-        return False
-        
-    def clear(self):
-        self.ingredients = []
-        self.cooking = False
-        self.cook_timer = 0
-        
-    def draw(self, screen, font, small_font):
+
+class CookingStation(simulation.CookingStation):
+    __slots__ = ()
+
+    def __init__(self, x, y, station_type, sprite_path=None, cook_time=180, ingredient_bits=None):
+        super().__init__(x, y, station_type, sprite_path, cook_time, ingredient_bits)
+
+    @property
+    def sprite(self):
+        return assets.get(self.sprite_path, (self.width, self.height))
+
+    def draw(self, screen, font, small_font, tick):
+        self.draw_static(screen, font, small_font)
+        self.draw_progress(screen, tick)
+
+    def draw_static(self, screen, font, small_font):
         # Station background
         if self.station_type == "prep":
             color = LIGHT_BROWN
@@ -191,7 +142,7 @@ class CookingStation:
             # Draw sprite
             screen.blit(self.sprite, (self.rect.x, self.rect.y))
             # Draw label on top
-            text = font.render(label, True, WHITE)
+            text = text_cache.render(font, label, True, WHITE)
             text_bg = pygame.Surface((text.get_width() + 6, text.get_height() + 2))
             text_bg.fill(BLACK)
             text_bg.set_alpha(180)
@@ -203,51 +154,36 @@ class CookingStation:
             pygame.draw.rect(screen, BLACK, self.rect, 3, border_radius=10)
 
             # Label
-            text = font.render(label, True, WHITE)
+            text = text_cache.render(font, label, True, WHITE)
             screen.blit(text, (self.rect.x + 10, self.rect.y + 5))
         
         # Show ingredients
         for i, ing in enumerate(self.ingredients):
-            ing_text = small_font.render(ing[:4], True, BLACK)
+            ing_text = text_cache.render(small_font, ing[:4], True, BLACK)
             screen.blit(ing_text, (self.rect.x + 10 + (i % 3) * 30, self.rect.y + 35 + (i // 3) * 20))
-        
+
+    def draw_progress(self, screen, tick):
         # Cooking progress
         if self.cooking:
-            progress = self.cook_timer / self.cook_time
-            bar_width = self.width - 20
-            pygame.draw.rect(screen, WHITE, (self.rect.x + 10, self.rect.bottom - 20, bar_width, 10))
-            pygame.draw.rect(screen, YELLOW, (self.rect.x + 10, self.rect.bottom - 20, bar_width * progress, 10))
-            
-    def is_player_near(self, player):
-        return self.rect.colliderect(player.rect.inflate(20, 20))
-
-class Customer:
-    def __init__(self, name, color, order, x, y, sprite_path=None):
-        self.name = name
-        self.color = color
-        self.order = order  # List of required ingredients
-        self.x = x
-        self.y = y
-        self.patience = 200.0
-        self.max_patience = 200.0
-        self.served = False
-        self.leaving = False
-        self.rect = pygame.Rect(x, y, 60, 80)
-        self.sprite = None
-        if sprite_path:
-            try:
-                self.sprite = pygame.image.load(sprite_path)
-                self.sprite = pygame.transform.scale(self.sprite, (60, 80))
-            except:
-                self.sprite = None
-        
-    def update(self):
-        if not self.served and not self.leaving:
-            self.patience -= 0.05
-            if self.patience <= 0:
-                self.leaving = True
-                
-    def draw(self, screen, font, small_font):
+            progress = self.progress(tick)
+            bar_rect = self.progress_rect()
+            pygame.draw.rect(screen, WHITE, bar_rect)
+            pygame.draw.rect(screen, YELLOW, (bar_rect.x, bar_rect.y, bar_rect.w * progress, bar_rect.h))
+
+    def progress_rect(self):
+        return pygame.Rect(self.rect.x + 10, self.rect.bottom - 20, self.width - 20, 10)
+
+class Customer(simulation.Customer):
+    __slots__ = ()
+
+    def __init__(self, name, color, order, x, y, sprite_path=None, max_patience=200.0):
+        super().__init__(name, color, order, x, y, sprite_path, max_patience)
+
+    @property
+    def sprite(self):
+        return assets.get(self.sprite_path, CUSTOMER_SIZE)
+
+    def draw(self, screen, font, small_font, tick):
         # Customer body
         if self.sprite:
             screen.blit(self.sprite, (self.rect.x, self.rect.y))
@@ -261,7 +197,7 @@ class Customer:
             pygame.draw.circle(screen, BLACK, (self.rect.centerx + 5, self.rect.y - 10), 3)
         
         # Name
-        name_text = small_font.render(self.name, True, BLACK)
+        name_text = text_cache.render(small_font, self.name, True, BLACK)
         screen.blit(name_text, (self.rect.x, self.rect.bottom + 5))
         
         # Order bubble
@@ -274,186 +210,155 @@ class Customer:
         pygame.draw.rect(screen, BLACK, (bubble_x, bubble_y, bubble_width, bubble_height), 2, border_radius=10)
         
         # Order text
-        order_text = small_font.render("Wants:", True, BLACK)
+        order_text = text_cache.render(small_font, "Wants:", True, BLACK)
         screen.blit(order_text, (bubble_x + 5, bubble_y + 5))
         
         for i, ingredient in enumerate(self.order):
-            ing_text = small_font.render(f"• {ingredient[:6]}", True, DARK_GREEN)
+            ing_text = text_cache.render(small_font, f"• {ingredient[:6]}", True, DARK_GREEN)
             screen.blit(ing_text, (bubble_x + 5, bubble_y + 30 + i * 20))
         
         # Patience bar
         bar_width = 100
-        patience_percent = self.patience / self.max_patience
+        patience_percent = self.patience_at(tick) / self.max_patience
         bar_color = GREEN if patience_percent > 0.5 else YELLOW if patience_percent > 0.25 else RED
         
         pygame.draw.rect(screen, GRAY, (bubble_x - 100, bubble_y + bubble_height, bar_width, 15))
         pygame.draw.rect(screen, bar_color, (bubble_x - 100, bubble_y + bubble_height, bar_width * patience_percent, 15))
 
+    def bounds(self):
+        # Body, name, order bubble and patience bar
+        bubble = pygame.Rect(self.rect.right + 10, self.rect.y, 150, 100)
+        patience_bar = pygame.Rect(bubble.x - 100, bubble.bottom, 100, 15)
+        name = pygame.Rect(self.rect.x, self.rect.bottom + 5, 100, 20)
+        return pygame.Rect(self.rect.x, self.rect.y - 25, 60, 25).unionall([self.rect, bubble, patience_bar, name])
+
+def read_direction(keys):
+    """Turns the held movement keys into a (dx, dy) direction"""
+    dx = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
+    dy = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
+    return dx, dy
+
+class GameSimulation(RestaurantSimulation):
+    # Same rules, but with entities that know how to draw themselves
+    player_class = Player
+    ingredient_station_class = IngredientStation
+    cooking_station_class = CookingStation
+    customer_class = Customer
+
 class VietnameseRestaurantGame:
-    def __init__(self):
+    def __init__(self, dirty_rects=False, seed=None, record_path=None, replay_path=None, profile_path=None,
+                 level=DEFAULT_LEVEL, max_fps=FPS, summary_path=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Nhà Hàng Việt Nam - Vietnamese Restaurant")
         self.clock = pygame.time.Clock()
+        self.max_fps = max_fps  # Render rate cap, 0 for uncapped; game speed doesn't depend on it
         self.running = True
+        # Time not yet simulated, and how far between two ticks the frame being drawn is
+        self.accumulator = 0.0
+        self.alpha = 1.0
         
         # Fonts
         self.title_font = pygame.font.Font(None, 64)
         self.font = pygame.font.Font(None, 32)
         self.small_font = pygame.font.Font(None, 20)
 
+        # Everything random in a run derives from one seed, so runs can be recorded and replayed
+        self.replay = InputReplay(replay_path) if replay_path else None
+        if self.replay:
+            # Replays always run on the seed and level they were recorded with
+            seed = self.replay.seed
+            level = self.replay.level
+        elif seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.recorder = InputRecorder(record_path, seed, level) if record_path else None
+
+        # Per-phase frame timing, F3 toggles the overlay. Replays keep every frame for comparison
+        self.profiler = FrameProfiler(window=max(600, len(self.replay) if self.replay else 0))
+        self.profile_path = profile_path
+        self.summary_path = summary_path  # Session throughput summary written on exit, see analytics.py
+
+        # Pre-converted asset bundle built by asset_bundle.py, if there is one
+        self.bundle = load_bundle()
+        if self.bundle:
+            assets.use_bundle(self.bundle)
+
         # --- MUSIC SETUP ---
-        self.music_manager = MusicManager() # <--- Add this
+        self.music_manager = MusicManager(random.Random(seed), preload_sfx=False, bundle=self.bundle) # <--- Add this
         self.music_manager.start_music()    # <--- Add this
 
-        # Load start screen background
-        self.start_screen_bg = None
-        try:
-            self.start_screen_bg = pygame.image.load("resources/sprites/start_screen_bg.png")
-            self.start_screen_bg = pygame.transform.scale(self.start_screen_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        except:
-            self.start_screen_bg = None
-
-        # FIXED: Load restaurant background
-        self.restaurant_bg = None
-        try:
-            self.restaurant_bg = pygame.image.load("resources/sprites/restaurant_background.png")
-            self.restaurant_bg = pygame.transform.scale(self.restaurant_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        except:
-            self.restaurant_bg = None
-
         # Game state
         self.state = MENU
-        self.score = 0
-        self.orders_completed = 0
-        
-        # Player
-        self.player = Player(400, 400, "resources/sprites/guy-sprite.png")
-
-        # Sprite mapping for ingredients
-        sprite_map = {
-            "Noodles": "resources/sprites/noodles.png",
-            "Broth": "resources/sprites/cooking_pho_pot.png",
-            "Beef": "resources/sprites/raw_beef.png",
-            "Chicken": "resources/sprites/chicken_slices.png",  # Using chicken as substitute
-            "Shrimp": "resources/sprites/shrimp.png",
-            "Herbs": "resources/sprites/basil.png",
-            "Lime": "resources/sprites/lime_wedges.png",
-            "Jalapeno": "resources/sprites/sliced_jalapeno.png",
-            "Cilantro": "resources/sprites/cilantro.png",
-            "Rice Paper": "resources/sprites/fresh_spring_rolls.png",
-            "Bread": "resources/sprites/banh_mi_sandwich.png",
-            "Fish Sauce": "resources/sprites/fish_sauce.png",
-        }
-
-        # Ingredient stations
-        self.ingredient_stations = [
-            IngredientStation(50, 300, "Noodles", YELLOW, sprite_map.get("Noodles")),
-            IngredientStation(150, 300, "Broth", BROWN, sprite_map.get("Broth")),
-            IngredientStation(250, 300, "Beef", RED, sprite_map.get("Beef")),
-            IngredientStation(350, 300, "Chicken", LIGHT_BROWN, sprite_map.get("Chicken")),
-            IngredientStation(50, 400, "Shrimp", ORANGE, sprite_map.get("Shrimp")),
-            IngredientStation(150, 400, "Herbs", GREEN, sprite_map.get("Herbs")),
-            IngredientStation(250, 400, "Lime", DARK_GREEN, sprite_map.get("Lime")),
-            IngredientStation(350, 400, "Jalapeno", YELLOW, sprite_map.get("Jalapeno")),
-            IngredientStation(50, 500, "Cilantro", GREEN, sprite_map.get("Cilantro")),
-            IngredientStation(150, 500, "Rice Paper", WHITE, sprite_map.get("Rice Paper")),
-            IngredientStation(250, 500, "Bread", LIGHT_BROWN, sprite_map.get("Bread")),
-            IngredientStation(350, 500, "Fish Sauce", BROWN, sprite_map.get("Fish Sauce")),
-        ]
-        
-        # Cooking stations
-        self.prep_station = CookingStation(50, 650, "prep", "resources/sprites/prep_station.png")
-        self.cook_station = CookingStation(200, 650, "cook", "resources/sprites/cook_station.png")
-        self.serve_station = CookingStation(350, 650, "serve", "resources/sprites/serve_station.png")
-        
-        # Customers
-        self.customers = []
-        self.customer_spawn_timer = 0
-        self.customer_spawn_delay = 600  # 5 seconds
-        
-        # Dishes
-        self.dishes = {
-            "Phở": ["Noodles", "Broth", "Beef", "Herbs", "Lime"],
-            "Bánh Mì": ["Bread", "Chicken", "Jalapeno", "Cilantro"],
-            "Bún Chả": ["Noodles", "Chicken", "Fish Sauce", "Herbs"],
-            "Gỏi Cuốn": ["Rice Paper", "Shrimp", "Herbs", "Noodles"],
-        }
-        
-        
-        # UI message
-        self.message = ""
-        self.message_timer = 0
-        
-    def spawn_customer(self):
-        # FIXED: Enforce maximum 3 customers
-        if len(self.customers) >= 3:
-            return
-
-        names = ["Bonny", "Hannah", "Talaal", "Ethan", "Danniel", "Mehul"]
-        colors = [RED, GREEN, LIGHT_BLUE, YELLOW, ORANGE]
-        sprites = [
-            "resources/sprites/customer1.png",
-            "resources/sprites/customer2.png",
-            "resources/sprites/customer3.png",
-            "resources/sprites/customer4.png",
-            "resources/sprites/customer5.png",
-            "resources/sprites/customer6.png"
-        ]
-
-        name = random.choice(names)
-        color = random.choice(colors)
-        sprite = random.choice(sprites)
-        dish_name = random.choice(list(self.dishes.keys()))
-        order = self.dishes[dish_name]
-
-        # FIXED: Define distinct spawn positions to prevent overlap
-        spawn_positions = [
-            (900, 150),   # Position 1 (top)
-            (900, 350),   # Position 2 (middle)
-            (900, 550)    # Position 3 (bottom)
-        ]
+        self.sim = GameSimulation(seed=seed, level=level)
+        self.sim.profiler = self.profiler
+
+        # Every image and sound is decoded on loader threads while the menu is already up
+        self.preloader = AssetPreloader()
+        self.queue_assets()
+
+        # Background, stations and their contents are composited into one cached layer
+        self.renderer = LayeredRenderer((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+        # Optional dirty-rect mode pushes only the regions that changed to the display
+        self.dirty_rects = DirtyRectTracker((SCREEN_WIDTH, SCREEN_HEIGHT), enabled=dirty_rects)
+        
+    def queue_assets(self):
+        screen_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        # Start screen first so the menu background shows up as early as possible
+        manifest = [(START_SCREEN_BG, screen_size), (RESTAURANT_BG, screen_size)]
+        manifest += self.sim.sprite_manifest()
+
+        # The bundle needs no decoding at all, its images are read straight out of the mapped file
+        if self.bundle:
+            manifest = [(path, size) for path, size in manifest if not self.bundle.has_image(path, size)]
+
+        # Sprites packed by build_atlas.py come from one image; anything missing from it loads loose
+        atlas = load_atlas()
+        if atlas and any(atlas.covers(path, size) for path, size in manifest):
+            self.preloader.add_atlas(atlas)
+            manifest = [(path, size) for path, size in manifest if not atlas.covers(path, size)]
+
+        # Customer spawns and pickups must never hit the disk, so every variant is pre-scaled
+        sizes = {}
+        for path, size in manifest:
+            sizes.setdefault(path, []).append(size)
+        for path, path_sizes in sizes.items():
+            self.preloader.add_image(path, path_sizes)
+        for name in self.music_manager.sfx_names:
+            self.preloader.add_sound(self.music_manager.sfx_path(name),
+                                     lambda sound, name=name: self.music_manager.add_sfx(name, sound),
+                                     decode=self.music_manager.load_sound)
+
+    def finish_loading(self):
+        """Blocks until every asset is loaded, for replays and benchmarks that skip the menu"""
+        self.preloader.wait()
+
+    @property
+    def start_screen_bg(self):
+        return assets.peek(START_SCREEN_BG, (SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    @property
+    def restaurant_bg(self):
+        return assets.get(RESTAURANT_BG, (SCREEN_WIDTH, SCREEN_HEIGHT))
 
-        # Get occupied positions
-        occupied_positions = set()
-        for customer in self.customers:
-            occupied_positions.add((customer.x, customer.y))
-
-        # Find available position
-        available_positions = [pos for pos in spawn_positions if pos not in occupied_positions]
-
-        if not available_positions:
-            return  # No available positions
-
-        # FIXED: Use first available position
-        x, y = available_positions[0]
-
-        customer = Customer(name, color, order, x, y, sprite)
-        self.customers.append(customer)
-            
-    def check_order_match(self, ingredients, customer_order):
-        return set(ingredients) == set(customer_order)
-        
-    def show_message(self, text):
-        self.message = text
-        self.message_timer = 120  # 2 seconds
-        
     def draw_menu(self):
-        # Draw background image or fallback
-        if self.start_screen_bg:
-            self.screen.blit(self.start_screen_bg, (0, 0))
+        # Draw background image or fallback while it is still loading
+        start_screen_bg = self.start_screen_bg
+        if start_screen_bg:
+            self.screen.blit(start_screen_bg, (0, 0))
         else:
             self.screen.fill(CREAM)
 
         # Title - positioned in the decorative title area
-        title = self.title_font.render("Pho So 2", True, (255, 215, 0))
-        title_shadow = self.title_font.render("Pho So 2", True, (139, 90, 43))
+        title = text_cache.render(self.title_font, "Pho So 2", True, (255, 215, 0))
+        title_shadow = text_cache.render(self.title_font, "Pho So 2", True, (139, 90, 43))
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 150))
         # Shadow effect
         self.screen.blit(title_shadow, (title_rect.x + 3, title_rect.y + 3))
         self.screen.blit(title, title_rect)
 
-        subtitle = self.font.render("Vietnamese Restaurant Game", True, (255, 255, 255))
-        subtitle_shadow = self.font.render("Vietnamese Restaurant Game", True, (100, 60, 20))
+        subtitle = text_cache.render(self.font, "Vietnamese Restaurant Game", True, (255, 255, 255))
+        subtitle_shadow = text_cache.render(self.font, "Vietnamese Restaurant Game", True, (100, 60, 20))
         subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, 200))
         self.screen.blit(subtitle_shadow, (subtitle_rect.x + 2, subtitle_rect.y + 2))
         self.screen.blit(subtitle, subtitle_rect)
@@ -462,14 +367,14 @@ class VietnameseRestaurantGame:
         instructions = [
             ("CONTROLS:", True),
             ("WASD or Arrow Keys - Move", False),
-            ("SPACE - Pick up ingredient / Add to station / Start cooking", False),
+            ("SPACE - Pick up ingredient / Add to prep / Send to cook / Serve", False),
             ("", False),
             ("HOW TO PLAY:", True),
             ("1. Check what customers want (right side)", False),
             ("2. Walk to ingredient stations and press SPACE to pick up", False),
             ("3. Bring ingredients to PREP station and add them", False),
-            ("4. Move dish to COOK station and start cooking", False),
-            ("5. When done, take to SERVE station and serve customers!", False),
+            ("4. Press SPACE at PREP again to send it to a free COOK stove", False),
+            ("5. Cooked dishes wait at the SERVE station, serve customers there!", False),
             ("", False),
             ("Keep customers happy before their patience runs out!", False),
         ]
@@ -477,210 +382,281 @@ class VietnameseRestaurantGame:
         y_offset = 290
         for line, is_header in instructions:
             if is_header:
-                text = self.font.render(line, True, (220, 20, 60))  # Red for headers
+                text = text_cache.render(self.font, line, True, (220, 20, 60))  # Red for headers
             else:
-                text = self.small_font.render(line, True, (60, 40, 20))  # Brown for text
+                text = text_cache.render(self.small_font, line, True, (60, 40, 20))  # Brown for text
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 25 if not is_header else 30
 
+        if not self.preloader.done():
+            self.draw_loading_bar()
+            return
+
         # "Press SPACE to Start" - positioned on the wooden sign
-        start_text = self.title_font.render("Press SPACE to Start!", True, (255, 215, 0))
-        start_shadow = self.title_font.render("Press SPACE to Start!", True, (80, 50, 20))
+        start_text = text_cache.render(self.title_font, "Press SPACE to Start!", True, (255, 215, 0))
+        start_shadow = text_cache.render(self.title_font, "Press SPACE to Start!", True, (80, 50, 20))
         start_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, 720))
         self.screen.blit(start_shadow, (start_rect.x + 2, start_rect.y + 2))
         self.screen.blit(start_text, start_rect)
         
-    def draw_game(self):
+    def draw_loading_bar(self):
+        # Loading progress - drawn on the wooden sign until assets are ready
+        bar = pygame.Rect(SCREEN_WIDTH // 2 - 200, 705, 400, 30)
+        pygame.draw.rect(self.screen, (80, 50, 20), bar, border_radius=8)
+        filled = bar.inflate(-8, -8)
+        filled.width = int(filled.width * self.preloader.progress())
+        pygame.draw.rect(self.screen, (255, 215, 0), filled, border_radius=6)
+        text = text_cache.render(self.small_font, f"Loading... {self.preloader.loaded}/{self.preloader.total}", True, WHITE)
+        self.screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, bar.y - 12)))
+
+    def draw_static_layer(self, surface):
+        sim = self.sim
         # FIXED: Draw authentic Vietnamese restaurant background
         if self.restaurant_bg:
-            self.screen.blit(self.restaurant_bg, (0, 0))
+            surface.blit(self.restaurant_bg, (0, 0))
         else:
             # Fallback to original
-            self.screen.fill(LIGHT_BLUE)
+            surface.fill(LIGHT_BLUE)
             # Draw floor
-            pygame.draw.rect(self.screen, CREAM, (0, 200, 500, 550))
-        
-        # Draw score
-        score_text = self.font.render(f"Score: {self.score}", True, BLACK)
-        self.screen.blit(score_text, (20, 20))
-        
-        orders_text = self.small_font.render(f"Orders: {self.orders_completed}", True, BLACK)
-        self.screen.blit(orders_text, (20, 60))
-        
+            pygame.draw.rect(surface, CREAM, (0, 200, 500, 550))
+
         # Draw ingredient stations
-        for station in self.ingredient_stations:
-            station.draw(self.screen, self.small_font)
-        
-        # Draw cooking stations
-        self.prep_station.draw(self.screen, self.font, self.small_font)
-        self.cook_station.draw(self.screen, self.font, self.small_font)
-        self.serve_station.draw(self.screen, self.font, self.small_font)
-        
-        # Draw customers
-        for customer in self.customers:
-            customer.draw(self.screen, self.font, self.small_font)
-        
-        # Draw player
-        self.player.draw(self.screen, self.small_font)
-        
+        for station in sim.ingredient_stations:
+            station.draw(surface, self.small_font)
+
+        # Draw cooking stations and their contents
+        for station in (sim.prep_station, *sim.cook_stations, sim.serve_station):
+            station.draw_static(surface, self.font, self.small_font)
+
         # Draw controls hint
-        controls = self.small_font.render("WASD: Move | SPACE: Interact", True, BLACK)
-        self.screen.blit(controls, (20, 100))
-        
-        # Draw interaction hints
-        if self.prep_station.is_player_near(self.player):
-            hint = self.small_font.render("[SPACE] Add ingredient / Move to cook", True, WHITE)
-            pygame.draw.rect(self.screen, BLACK, (self.prep_station.rect.x, self.prep_station.rect.y - 25, 300, 20))
-            self.screen.blit(hint, (self.prep_station.rect.x + 5, self.prep_station.rect.y - 23))
-            
-        if self.cook_station.is_player_near(self.player):
-            hint = self.small_font.render("[SPACE] Start cooking / Move to serve", True, WHITE)
-            pygame.draw.rect(self.screen, BLACK, (self.cook_station.rect.x, self.cook_station.rect.y - 25, 300, 20))
-            self.screen.blit(hint, (self.cook_station.rect.x + 5, self.cook_station.rect.y - 23))
-            
-        if self.serve_station.is_player_near(self.player):
-            hint = self.small_font.render("[SPACE] Serve to customer", True, WHITE)
-            pygame.draw.rect(self.screen, BLACK, (self.serve_station.rect.x, self.serve_station.rect.y - 25, 250, 20))
-            self.screen.blit(hint, (self.serve_station.rect.x + 5, self.serve_station.rect.y - 23))
-        
-        for station in self.ingredient_stations:
-            if station.is_player_near(self.player) and not self.player.held_ingredient:
-                hint = self.small_font.render(f"[SPACE] Pick up", True, WHITE)
-                pygame.draw.rect(self.screen, BLACK, (station.rect.x, station.rect.y - 25, 150, 20))
-                self.screen.blit(hint, (station.rect.x + 5, station.rect.y - 23))
-        
-        # Draw message
-        if self.message_timer > 0:
-            message_surface = self.font.render(self.message, True, WHITE)
-            message_rect = message_surface.get_rect(center=(SCREEN_WIDTH // 2, 150))
-            pygame.draw.rect(self.screen, BLACK, message_rect.inflate(20, 10), border_radius=10)
-            self.screen.blit(message_surface, message_rect)
-            self.message_timer -= 1
-        
-    def handle_interaction(self):
-        # Pick up ingredient
-        for station in self.ingredient_stations:
-            if station.is_player_near(self.player) and not self.player.held_ingredient:
-                self.player.held_ingredient = station.ingredient_name
+        controls = text_cache.render(self.small_font, "WASD: Move | SPACE: Interact", True, BLACK)
+        surface.blit(controls, (20, 100))
 
+    def static_layer_key(self):
+        sim = self.sim
+        return (sim.prep_station.revision, sim.serve_station.revision,
+                *[station.revision for station in sim.cook_stations])
+
+    def draw_game(self):
+        sim = self.sim
+        profiler = self.profiler
+        with profiler.section("draw.static"):
+            # Static layers only get re-baked when a station's contents change
+            if self.renderer.draw_static(self.screen, self.static_layer_key(), self.draw_static_layer):
+                self.dirty_rects.invalidate()
+        
+        with profiler.section("draw.hud"):
+            # Draw score
+            score_text = text_cache.render(self.font, f"Score: {sim.score}", True, BLACK)
+            self.dirty_rects.add(self.screen.blit(score_text, (20, 20)))
+
+            orders_text = text_cache.render(self.small_font, f"Orders: {sim.orders_completed}", True, BLACK)
+            self.dirty_rects.add(self.screen.blit(orders_text, (20, 60)))
+
+            # Customers queued off-screen for a seat, jobs waiting for a burner and plates on the pass
+            kitchen = sim.kitchen
+            if sim.line or kitchen.jobs or len(kitchen.ready) > 1:
+                queue_text = text_cache.render(
+                    self.small_font,
+                    f"In line: {len(sim.line)} | Cook queue: {len(kitchen.jobs)} | On the pass: {len(kitchen.ready)}",
+                    True, BLACK)
+                self.dirty_rects.add(self.screen.blit(queue_text, (20, 80)))
+
+            # Draw cooking progress
+            for station in (sim.prep_station, *sim.cook_stations, sim.serve_station):
+                station.draw_progress(self.screen, sim.tick)
+                if station.cooking:
+                    self.dirty_rects.add(station.progress_rect())
+        
+        with profiler.section("draw.customers"):
+            # Draw customers
+            for customer in sim.customers:
+                customer.draw(self.screen, self.font, self.small_font, sim.tick)
+                self.dirty_rects.add(customer.bounds())
+        
+        with profiler.section("draw.player"):
+            # Draw player
+            sim.player.interpolate(self.alpha)
+            sim.player.draw(self.screen, self.small_font)
+            self.dirty_rects.add(sim.player.bounds())
+        
+        with profiler.section("draw.hints"):
+            # Draw interaction hints
+            for station in sim.near_player():
+                if station is sim.prep_station:
+                    self.draw_hint(station, "[SPACE] Add ingredient / Send to cook", 300)
+                elif isinstance(station, CookingStation) and station.station_type == "cook":
+                    self.draw_hint(station, "Cooks prep batches automatically", 300)
+                elif station is sim.serve_station:
+                    self.draw_hint(station, "[SPACE] Serve to customer", 250)
+                elif isinstance(station, IngredientStation) and not sim.player.held_ingredient:
+                    self.draw_hint(station, "[SPACE] Pick up", 150)
+
+            # Draw message
+            if sim.message_visible():
+                message_surface = text_cache.render(self.font, sim.message, True, WHITE)
+                message_rect = message_surface.get_rect(center=(SCREEN_WIDTH // 2, 150))
+                pygame.draw.rect(self.screen, BLACK, message_rect.inflate(20, 10), border_radius=10)
+                self.dirty_rects.add(message_rect.inflate(20, 10))
+                self.screen.blit(message_surface, message_rect)
+        
+    def draw_hint(self, station, text, width):
+        hint = text_cache.render(self.small_font, text, True, WHITE)
+        hint_rect = pygame.Rect(station.rect.x, station.rect.y - 25, width, 20)
+        pygame.draw.rect(self.screen, BLACK, hint_rect)
+        self.screen.blit(hint, (station.rect.x + 5, station.rect.y - 23))
+        self.dirty_rects.add(hint_rect)
+
+    def handle_sim_events(self):
+        for kind, data in self.sim.events:
+            if kind == "pickup":
                 self.music_manager.play_sfx("pop")
 
-                # Set the downscaled sprite
-                if station.sprite:
-                    try:
-                        self.player.held_ingredient_sprite = pygame.transform.scale(station.sprite, (30, 30))
-                    except:
-                        self.player.held_ingredient_sprite = None
-                else:
-                    self.player.held_ingredient_sprite = None
-                self.show_message(f"Picked up {station.ingredient_name}!")
-                return
-        
-        # Interact with prep station
-        if self.prep_station.is_player_near(self.player):
-            if self.player.held_ingredient:
-                self.prep_station.add_ingredient(self.player.held_ingredient)
-                self.show_message(f"Added {self.player.held_ingredient} to prep!")
-                self.player.held_ingredient = None
-                self.player.held_ingredient_sprite = None
-            elif self.prep_station.ingredients and not self.cook_station.ingredients:
-                # Move to cook station
-                self.cook_station.ingredients = self.prep_station.ingredients[:]
-                self.prep_station.clear()
-                self.show_message("Moved to cook station!")
-            return
-        
-        # Interact with cook station
-        if self.cook_station.is_player_near(self.player):
-            if not self.cook_station.cooking and self.cook_station.ingredients:
-                self.cook_station.start_cooking()
-                self.show_message("Started cooking!")
-            elif not self.cook_station.cooking and not self.cook_station.ingredients:
-                self.show_message("Station is empty!")
-            elif self.cook_station.cooking:
-                self.show_message("Still cooking...")
-            return
-        
-        # Interact with serve station
-        if self.serve_station.is_player_near(self.player):
-            if self.serve_station.ingredients:
-                # Try to serve to a customer
-                for customer in self.customers[:]:
-                    if not customer.leaving and not customer.served:
-                        if self.check_order_match(self.serve_station.ingredients, customer.order):
-                            # Correct order!
-                            patience_bonus = int(customer.patience)
-                            self.score += 100 + patience_bonus
-                            self.orders_completed += 1
-                            self.customers.remove(customer)
-                            self.serve_station.clear()
-                            self.show_message(f"Perfect! +{100 + patience_bonus} points!")
-                            return
-                        else:
-                            # Wrong order
-                            self.show_message("Wrong order for this customer!")
-                            return
-                self.show_message("No matching customer order!")
-            else:
-                self.show_message("Serve station is empty!")
-            return
-    
+    def start_game(self):
+        self.state = GAME
+        self.accumulator = 0.0
+        self.dirty_rects.invalidate()
+        self.sim.spawn_customer()
+
+    def read_input(self, interactions):
+        """Returns this tick's (dx, dy, interactions), from the keyboard or the replay log"""
+        if self.replay:
+            if self.replay.finished():
+                self.running = False
+                return 0, 0, 0
+            return self.replay.next_input()
+        dx, dy = read_direction(pygame.key.get_pressed())
+        interactions = min(interactions, MAX_INTERACTIONS)
+        if self.recorder:
+            self.recorder.record(dx, dy, interactions)
+        return dx, dy, interactions
+
+    def ticks_due(self):
+        """Takes whole ticks out of the accumulator and sets the interpolation factor for the leftover"""
+        if self.replay:
+            # Replays run one tick per frame, uncapped, so their frame times stay comparable
+            self.accumulator = 0.0
+            self.alpha = 1.0
+            return 1
+        ticks = int(self.accumulator / TICK_SECONDS)
+        if ticks > MAX_TICKS_PER_FRAME:
+            # Too far behind (a stall, a dragged window): drop the backlog instead of fast-forwarding
+            ticks = MAX_TICKS_PER_FRAME
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * TICK_SECONDS
+        self.alpha = self.accumulator / TICK_SECONDS
+        return ticks
+
     def run(self):
+        if self.replay:
+            # Replays skip the menu and run uncapped so frame times can be compared
+            self.finish_loading()
+            self.start_game()
+
+        profiler = self.profiler
+        interactions = 0  # SPACE presses not yet handed to a tick
+        last_frame = perf_counter()
         while self.running:
-            # Check music
-            self.music_manager.update()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        if self.state == MENU:
-                            self.state = GAME
-                            self.spawn_customer()
-                        elif self.state == GAME:
-                            self.handle_interaction()
+            profiler.begin_frame()
+            now = perf_counter()
+            self.accumulator += now - last_frame
+            last_frame = now
+
+            if not self.preloader.done():
+                with profiler.section("preload"):
+                    self.preloader.pump()
+                self.dirty_rects.invalidate()
+
+            with profiler.section("events"):
+                for event in pygame.event.get():
+                    # Track changes arrive as events, so music costs nothing on frames without one
+                    if self.music_manager.handle_event(event):
+                        continue
+                    if event.type == pygame.QUIT:
+                        self.running = False
+
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE:
+                            if self.state == MENU and self.preloader.done():
+                                self.start_game()
+                            elif self.state == GAME:
+                                interactions += 1
+                        elif event.key == pygame.K_F3:
+                            profiler.toggle_overlay()
+                            self.dirty_rects.invalidate()
             
             if self.state == GAME:
-                # Update player movement
-                keys = pygame.key.get_pressed()
-                self.player.move(keys)
-                
-                # Update cooking
-                if self.cook_station.update():
-                    # Cooking done, move to serve station
-                    if not self.serve_station.ingredients:
-                        self.serve_station.ingredients = self.cook_station.ingredients[:]
-                        self.cook_station.clear()
-                        self.show_message("Dish ready to serve!")
-                
-                # Update customers
-                for customer in self.customers[:]:
-                    customer.update()
-                    if customer.leaving:
-                        self.customers.remove(customer)
-                        self.show_message("Customer left! :(")
-                
-                # Spawn new customers
-                self.customer_spawn_timer += 1
-                if self.customer_spawn_timer >= self.customer_spawn_delay:
-                    self.spawn_customer()
-                    self.customer_spawn_timer = 0
+                # Advance the simulation by however many fixed ticks of real time have passed
+                for _ in range(self.ticks_due()):
+                    dx, dy, tick_interactions = self.read_input(interactions)
+                    interactions = 0
+                    if not self.running:
+                        break
+                    self.sim.step(dx, dy, tick_interactions)
+                    self.handle_sim_events()
+                if not self.running:
+                    break
+            else:
+                self.accumulator = 0.0
             
             # Draw
             if self.state == MENU:
-                self.draw_menu()
+                with profiler.section("draw.menu"):
+                    self.draw_menu()
             elif self.state == GAME:
                 self.draw_game()
-                
-            pygame.display.flip()
-            self.clock.tick(FPS)
-        
+
+            overlay_rect = profiler.draw(self.screen, self.small_font, text_cache)
+            if overlay_rect:
+                self.dirty_rects.add(overlay_rect)
+
+            with profiler.section("present"):
+                self.dirty_rects.present()
+            profiler.end_frame()
+
+            if not self.replay:
+                self.clock.tick(self.max_fps)
+
+        self.finish()
         pygame.quit()
         sys.exit()
 
+    def finish(self):
+        if self.recorder:
+            self.recorder.save(self.sim)
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
+        if self.summary_path:
+            self.sim.write_summary(self.summary_path)
+        if self.replay:
+            frame = self.profiler.stats(FRAME)
+            if frame:
+                print(f"Replay: {self.profiler.frames} frames, mean {frame['mean_ms']:.2f}ms, "
+                      f"p95 {frame['p95_ms']:.2f}ms, p99 {frame['p99_ms']:.2f}ms, max {frame['max_ms']:.2f}ms")
+            for key, (expected, actual) in self.replay.check(self.sim).items():
+                print(f"Replay MISMATCH {key}: recorded {expected}, replayed {actual}")
+        if self.profile_path or self.replay:
+            print("\n".join(self.music_manager.sfx.summary()))
+
 if __name__ == "__main__":
-    game = VietnameseRestaurantGame()
+    parser = argparse.ArgumentParser(description="Pho So 2 - Vietnamese Restaurant Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only push changed regions to the display (software rendering / remote X)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for customers and the playlist")
+    parser.add_argument("--record", metavar="LOG", help="record this run's inputs to a replay log")
+    parser.add_argument("--replay", metavar="LOG", help="re-drive the game from a replay log")
+    parser.add_argument("--profile", metavar="PATH", help="write per-phase frame timings to a .json or .csv on exit")
+    parser.add_argument("--summary", metavar="PATH",
+                        help="write orders/minute, wait percentiles and station idle time as JSON on exit")
+    parser.add_argument("--level", default=DEFAULT_LEVEL, help="kitchen layout and menu to play")
+    parser.add_argument("--max-fps", type=int, default=FPS,
+                        help="render rate cap, 0 for uncapped; the game always simulates at 60 ticks per second")
+    args = parser.parse_args()
+
+    game = VietnameseRestaurantGame(dirty_rects=args.dirty_rects, seed=args.seed,
+                                    record_path=args.record, replay_path=args.replay,
+                                    profile_path=args.profile, level=args.level, max_fps=args.max_fps,
+                                    summary_path=args.summary)
     game.run()
\ No newline at end of file